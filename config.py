@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import os
+import sys
+from dataclasses import MISSING, dataclass, field, fields
 from pathlib import Path
 from typing import List, Optional
-import yaml
 
+# PyYAML is imported on first parse (see _get_yaml)
+_yaml = None
+_YamlLoader = None
 
-@dataclass
+
+@dataclass(slots=True)
 class ServerConfig:
     name: str
     host: str
@@ -17,7 +22,7 @@ class ServerConfig:
     logs: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class EmailConfig:
     enabled: bool = False
     smtp_host: str = ""
@@ -27,27 +32,31 @@ class EmailConfig:
     password: Optional[str] = None
     from_addr: Optional[str] = None
     to_addrs: List[str] = field(default_factory=list)
+    max_per_connection: int = 100
+    smtp_idle_timeout: int = 240  # Seconds an idle SMTP session is reused before reconnecting
+    max_html_bytes: int = 65536   # Larger alert emails are sent as plain text (0 = no limit)
+    html_enabled: bool = True     # False sends alert emails as plain text only
 
 
-@dataclass
+@dataclass(slots=True)
 class StorageConfig:
     sqlite_path: str = "./data/vigilant_raccoon.db"
 
 
-@dataclass
+@dataclass(slots=True)
 class CollectionConfig:
     poll_interval_seconds: int = 60
     tail_lines: int = 2000
     ignore_source_ips: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class WebConfig:
     host: str = "127.0.0.1"
     port: int = 8000
 
 
-@dataclass
+@dataclass(slots=True)
 class LoggingConfig:
     level: str = "INFO"           # DEBUG, INFO, WARNING, ERROR
     file_path: str = "./logs/app.log"
@@ -57,10 +66,11 @@ class LoggingConfig:
     # Legacy settings (kept for backward compatibility)
     max_bytes: int = 1_000_000     # 1 MB
     backup_count: int = 3
+    fast_rotation: bool = True    # Size rotation checks the open stream instead of stat() per record
     console: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class AppConfig:
     servers: List[ServerConfig]
     poll_interval_seconds: int = 60
@@ -71,25 +81,97 @@ class AppConfig:
     logging: LoggingConfig = field(default_factory=LoggingConfig)
 
 
+# Accepted keys per section, so unknown YAML keys are ignored instead of raising
+_SERVER_FIELDS = frozenset(f.name for f in fields(ServerConfig))
+_EMAIL_FIELDS = frozenset(f.name for f in fields(EmailConfig))
+_STORAGE_FIELDS = frozenset(f.name for f in fields(StorageConfig))
+_COLLECTION_FIELDS = frozenset(f.name for f in fields(CollectionConfig))
+_WEB_FIELDS = frozenset(f.name for f in fields(WebConfig))
+_LOGGING_FIELDS = frozenset(f.name for f in fields(LoggingConfig))
+_SERVER_REQUIRED = frozenset(
+    f.name for f in fields(ServerConfig)
+    if f.default is MISSING and f.default_factory is MISSING
+)
+_SECTIONS = ("email", "storage", "collection", "web", "logging")
+# Low-cardinality server keys reused as dict keys and in comparisons
+_SERVER_INTERNED = ("name", "host", "username")
+
+
+def _known(data: dict, allowed: frozenset) -> dict:
+    return {k: v for k, v in data.items() if k in allowed}
+
+
+def _section(cls, data: Optional[dict], allowed: frozenset):
+    # Missing or empty sections build the defaults directly, no throwaway {}
+    return cls(**_known(data, allowed)) if data else cls()
+
+
+def _get_yaml():
+    """Import PyYAML on first use so importing the config dataclasses stays cheap."""
+    global _yaml, _YamlLoader
+    if _yaml is None:
+        import yaml
+        # libyaml C binding when available, pure-Python safe loader otherwise
+        _YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        _yaml = yaml
+    return _yaml
+
+
+def _validate_raw(raw) -> None:
+    """Check the overall shape of the parsed YAML in one pass, before any dataclass is built."""
+    if not isinstance(raw, dict):
+        raise ValueError("Invalid config: top level must be a mapping")
+    servers = raw.get("servers") or []
+    if not isinstance(servers, list):
+        raise ValueError("Invalid config: 'servers' must be a list")
+    for i, srv in enumerate(servers):
+        if not isinstance(srv, dict):
+            raise ValueError(f"Invalid config: servers[{i}] must be a mapping")
+        missing = _SERVER_REQUIRED.difference(srv)
+        if missing:
+            raise ValueError(f"Invalid config: servers[{i}] is missing {', '.join(sorted(missing))}")
+    for section in _SECTIONS:
+        value = raw.get(section)
+        if value is not None and not isinstance(value, dict):
+            raise ValueError(f"Invalid config: '{section}' must be a mapping")
+
+
+def _read_raw_config(path: Path) -> dict:
+    """Parse the YAML config file."""
+    # Earlier releases kept a JSON copy of the parsed config, passwords included, next to
+    # the YAML file; the config is only read at startup, so remove it rather than reuse it
+    try:
+        os.remove(path.with_suffix(".cache.json"))
+    except OSError:
+        pass
+
+    # Binary mode: libyaml decodes UTF-8 itself, no Python-side decode pass
+    yaml = _get_yaml()
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
+
 def load_config(path: str | Path) -> AppConfig:
-    with open(path, "r", encoding="utf-8") as f:
-        raw = yaml.safe_load(f) or {}
-
-    # Filtrage des champs valides pour ServerConfig
-    def filter_server_config(srv_data):
-        valid_fields = {'name', 'host', 'port', 'username', 'password', 'private_key_path', 'logs'}
-        return {k: v for k, v in srv_data.items() if k in valid_fields}
-    
-    servers = [ServerConfig(**filter_server_config(srv)) for srv in raw.get("servers", [])]
-    email = EmailConfig(**(raw.get("email") or {}))
-    storage = StorageConfig(**(raw.get("storage") or {}))
-    collection = CollectionConfig(**(raw.get("collection") or {}))
-    web = WebConfig(**(raw.get("web") or {}))
-    logging_cfg = LoggingConfig(**(raw.get("logging") or {}))
+    raw = _read_raw_config(Path(path))
+    _validate_raw(raw)
+
+    raw_servers = raw.get("servers") or ()
+    for srv in raw_servers:
+        for key in _SERVER_INTERNED:
+            value = srv.get(key)
+            if type(value) is str:
+                srv[key] = sys.intern(value)
+
+    servers = [ServerConfig(**_known(srv, _SERVER_FIELDS)) for srv in raw_servers]
+    email = _section(EmailConfig, raw.get("email"), _EMAIL_FIELDS)
+    storage = _section(StorageConfig, raw.get("storage"), _STORAGE_FIELDS)
+    collection = _section(CollectionConfig, raw.get("collection"), _COLLECTION_FIELDS)
+    web = _section(WebConfig, raw.get("web"), _WEB_FIELDS)
+    logging_cfg = _section(LoggingConfig, raw.get("logging"), _LOGGING_FIELDS)
 
     return AppConfig(
         servers=servers,
-        poll_interval_seconds=int(raw.get("collection", {}).get("poll_interval_seconds", 60)),
+        poll_interval_seconds=int(collection.poll_interval_seconds),
         email=email,
         storage=storage,
         collection=collection,
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, List
 
 
-@dataclass
+@dataclass(slots=True)
 class Alert:
     id: Optional[int] = None
     server_name: str = ""
@@ -20,8 +21,19 @@ class Alert:
     acknowledged_at: Optional[datetime] = None
     acknowledged_by: Optional[str] = None
 
+    def __post_init__(self) -> None:
+        # These fields repeat across thousands of alerts; share one string object each
+        if type(self.server_name) is str:
+            self.server_name = sys.intern(self.server_name)
+        if type(self.log_source) is str:
+            self.log_source = sys.intern(self.log_source)
+        if type(self.rule) is str:
+            self.rule = sys.intern(self.rule)
+        if type(self.level) is str:
+            self.level = sys.intern(self.level)
 
-@dataclass
+
+@dataclass(slots=True)
 class Server:
     id: Optional[int] = None
     name: str = ""
@@ -33,7 +45,7 @@ class Server:
     logs: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class AlertException:
     id: Optional[int] = None
     rule_type: str = ""  # "ip", "username", "server", "log_source", "rule_pattern"
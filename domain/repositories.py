@@ -17,7 +17,10 @@ class AlertRepository(ABC):
     def list_alerts(self, 
                    server_name: Optional[str] = None,
                    acknowledged: Optional[bool] = None,
-                   limit: Optional[int] = None) -> List[Alert]:
+                   limit: Optional[int] = None,
+                   since: Optional[datetime] = None,
+                   level: Optional[str] = None,
+                   log_source: Optional[str] = None) -> List[Alert]:
         """List alerts with optional filtering."""
         pass
 
@@ -96,3 +99,7 @@ class AlertExceptionRepository(ABC):
     def is_alert_excepted(self, alert: Alert) -> bool:
         """Check if an alert should be excepted based on current rules."""
         pass
+
+    def filter_excepted(self, alerts: List[Alert]) -> List[Alert]:
+        """Return the alerts not excepted by current rules, in their original order."""
+        return [alert for alert in alerts if not self.is_alert_excepted(alert)]
@@ -7,6 +7,7 @@ import sys
 import os
 import time
 import subprocess
+from collections import Counter
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from use_cases.process_monitoring import ProcessMonitor, run_process_monitoring
@@ -124,16 +125,11 @@ def demo_complete_monitoring():
         
         # Display alerts by type
         if alerts:
-            by_type = {}
-            for alert in alerts:
-                alert_type = alert.rule
-                if alert_type not in by_type:
-                    by_type[alert_type] = []
-                by_type[alert_type].append(alert)
+            by_type = Counter(alert.rule for alert in alerts)
             
             print("\nAlerts by type:")
-            for alert_type, type_alerts in by_type.items():
-                print(f"   {alert_type}: {len(type_alerts)} alerts")
+            for alert_type, count in by_type.items():
+                print(f"   {alert_type}: {count} alerts")
         
         return True
         
@@ -1,21 +1,58 @@
 from __future__ import annotations
 
+import atexit
 import logging
 import logging.handlers
+import os
+import queue
 from pathlib import Path
+from typing import Optional
 
 from config import LoggingConfig
 
 
+class StatFreeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Size-based rotation that reads the size from the open stream.
+
+    The stdlib handler stats the log path twice and formats every record an
+    extra time just to decide whether to roll over; this one only touches the
+    filesystem once the size limit has actually been reached.
+    """
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.stream is None:  # delay was set...
+            self.stream = self._open()
+        if self.maxBytes > 0 and self.stream.tell() >= self.maxBytes:
+            # Never rollover anything other than regular files (bpo-45401)
+            return os.path.isfile(self.baseFilename)
+        return False
+
+
+# Background thread that performs the actual formatting and I/O for every logger
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_listener() -> None:
+    """Drain queued records and close the handlers behind the listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
 def setup_logging(cfg: LoggingConfig) -> None:
     level = getattr(logging, str(cfg.level).upper(), logging.INFO)
     root = logging.getLogger()
     root.setLevel(level)
 
-    # Ensure log directory exists
+    # Ensure log directory exists (exist_ok already covers the existing/racing case)
     log_path = Path(cfg.file_path)
-    if log_path.parent and not log_path.parent.exists():
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
 
     # Clear existing handlers to avoid duplicates
     for h in list(root.handlers):
@@ -41,7 +78,8 @@ def setup_logging(cfg: LoggingConfig) -> None:
         file_handler.namer = lambda name: name.replace(".log", "") + ".log"
     else:
         # Legacy size-based rotation
-        file_handler = logging.handlers.RotatingFileHandler(
+        handler_cls = StatFreeRotatingFileHandler if cfg.fast_rotation else logging.handlers.RotatingFileHandler
+        file_handler = handler_cls(
             filename=str(log_path), 
             maxBytes=int(cfg.max_bytes), 
             backupCount=int(cfg.backup_count), 
@@ -50,10 +88,19 @@ def setup_logging(cfg: LoggingConfig) -> None:
     
     file_handler.setFormatter(formatter)
     file_handler.setLevel(level)
-    root.addHandler(file_handler)
+    handlers = [file_handler]
 
     if cfg.console:
         console = logging.StreamHandler()
         console.setFormatter(formatter)
         console.setLevel(level)
-        root.addHandler(console)
+        handlers.append(console)
+
+    # Loggers only enqueue records; the listener thread formats and writes them,
+    # so collector and web threads never block on disk or console I/O
+    global _listener
+    _stop_listener()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
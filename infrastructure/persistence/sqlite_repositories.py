@@ -1,21 +1,334 @@
 from __future__ import annotations
 
+import os
+import queue
 import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
 from contextlib import contextmanager
-from datetime import datetime
-from typing import List, Optional, Iterable
+from dataclasses import replace
+from functools import lru_cache
+from pathlib import Path
+from itertools import chain
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Iterable, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # optional speedup, exceptions are matched one substring at a time otherwise
+    ahocorasick = None
 
 from domain.entities import Alert, Server, AlertException
 from domain.repositories import AlertRepository, ServerRepository, StateRepository, AlertExceptionRepository
 
 
-class SQLiteAlertRepository(AlertRepository):
+def _connect(db_path: str, read_only: bool = False) -> sqlite3.Connection:
+    # The writer is shared by the web and collector threads (_SQLiteRepository serialises
+    # access); pooled readers are handed from thread to thread.
+    # The repositories issue a fixed set of SQL strings; keep all of them prepared.
+    if read_only:
+        conn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True,
+                               check_same_thread=False, cached_statements=256)
+    else:
+        # Autocommit: a single-statement write commits on its own, without the implicit
+        # BEGIN the sqlite3 module would otherwise issue; batches use explicit BEGIN/COMMIT
+        conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256,
+                               isolation_level=None)
+        # Only takes effect while the file is still empty, i.e. for newly created databases
+        conn.execute("PRAGMA page_size=8192")
+    conn.row_factory = sqlite3.Row
+    # Dashboard polls re-read the same pages: serve them from the OS page cache via mmap
+    conn.execute("PRAGMA mmap_size=268435456")
+    # 64 MiB page cache per connection (negative = KiB) and in-memory sort/temp b-trees
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    if not read_only:
+        # In WAL mode NORMAL only fsyncs at checkpoints and still cannot corrupt the database
+        conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _enable_wal(conn: sqlite3.Connection) -> None:
+    """Switch the database file to write-ahead logging (persistent, so once per repository is enough).
+
+    Readers (web UI) no longer block the collector's writes and vice versa, and a
+    commit appends to the WAL instead of rewriting a rollback journal.
+    """
+    conn.execute("PRAGMA journal_mode=WAL")
+
+
+# Alert timestamps are stored as INTEGER microseconds since the Unix epoch (UTC):
+# compact, compared as integers by the timestamp filter/sort, and no ISO parse per row read
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_epoch_us(ts: datetime) -> int:
+    """Naive datetimes are taken as UTC, like the utcnow() values the app produces."""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return (ts - _EPOCH) // _MICROSECOND
+
+
+# Floods produce runs of alerts sharing a timestamp, and datetimes are immutable,
+# so decoded values are memoized
+@lru_cache(maxsize=4096)
+def _from_epoch_us(value: int) -> datetime:
+    """Inverse of _to_epoch_us, returning a naive UTC datetime (exact, no float rounding)."""
+    return _EPOCH + timedelta(microseconds=value)
+
+
+# Hot alert statements, kept as module constants so each one is prepared once per
+# connection and then served from its statement cache
+_INSERT_ALERT_SQL = (
+    "INSERT INTO alerts (server_name, log_source, rule, level, message, ip_address, username,"
+    " timestamp, acknowledged, acknowledged_at, acknowledged_by)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# Column order expected by _alert_row_factory
+_ALERT_COLUMNS = (
+    "id, server_name, log_source, rule, level, message, ip_address, username,"
+    " timestamp, acknowledged, acknowledged_at, acknowledged_by"
+)
+_LIST_ALERTS_BASE_SQL = f"SELECT {_ALERT_COLUMNS} FROM alerts WHERE 1=1"
+# Current time in epoch microseconds computed by SQLite ('now' is fixed for the whole
+# statement, millisecond resolution); unixepoch('subsec') would need SQLite 3.42
+_SQL_NOW_EPOCH_US = (
+    "(CAST(strftime('%s', 'now') AS INTEGER) * 1000000"
+    " + CAST(substr(strftime('%f', 'now'), 4) AS INTEGER) * 1000)"
+)
+_ACK_ALERT_SQL = (
+    f"UPDATE alerts SET acknowledged = TRUE, acknowledged_at = {_SQL_NOW_EPOCH_US}, acknowledged_by = ?"
+    " WHERE id = ?"
+)
+_ACK_RULE_SQL = (
+    f"UPDATE alerts SET acknowledged = TRUE, acknowledged_at = {_SQL_NOW_EPOCH_US}, acknowledged_by = ?"
+    " WHERE rule = ? AND acknowledged = FALSE"
+)
+
+@lru_cache(maxsize=None)
+def _list_alerts_sql(server_name: bool, acknowledged: bool, since: bool,
+                     level: bool, log_source: bool, limit: bool) -> str:
+    """list_alerts query for one combination of filters, built once and then reused as-is."""
+    query = _LIST_ALERTS_BASE_SQL
+    if server_name:
+        query += " AND server_name = ?"
+    if acknowledged:
+        query += " AND acknowledged = ?"
+    if since:
+        query += " AND timestamp >= ?"
+    if level:
+        query += " AND level = ?"
+    if log_source:
+        query += " AND log_source = ?"
+    query += " ORDER BY timestamp DESC"
+    if limit:
+        query += " LIMIT ?"
+    return query
+
+
+# Large batches go through a compound INSERT of this many rows per statement, which
+# stays under SQLite's historical 999 bound-parameter limit (11 columns per row)
+_INSERT_ALERT_CHUNK = 999 // 11
+_INSERT_ALERT_CHUNK_SQL = _INSERT_ALERT_SQL + ", (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)" * (_INSERT_ALERT_CHUNK - 1)
+
+
+def _alert_to_row(alert: Alert) -> tuple:
+    """Bind parameters for the alerts INSERT, in column order."""
+    return (
+        alert.server_name, alert.log_source, alert.rule, alert.level, alert.message,
+        alert.ip_address, alert.username, _to_epoch_us(alert.timestamp),
+        alert.acknowledged, _to_epoch_us(alert.acknowledged_at) if alert.acknowledged_at else None,
+        alert.acknowledged_by
+    )
+
+
+def _alert_dedup_key(alert: Alert) -> tuple:
+    """Identity of an alert for duplicate suppression: the same log line read again.
+
+    Only exact repeats match (same timestamp and message, which holds the raw line), so
+    distinct attempts close together, e.g. a brute-force burst, are all stored.
+    """
+    return (
+        alert.server_name, alert.log_source, alert.rule, alert.message, alert.timestamp,
+    )
+
+
+def _alert_row_factory(cursor: sqlite3.Cursor, row: tuple) -> Alert:
+    """Cursor row factory turning a raw _ALERT_COLUMNS tuple straight into an Alert."""
+    (alert_id, server_name, log_source, rule, level, message, ip_address, username,
+     timestamp, acknowledged, acknowledged_at, acknowledged_by) = row
+    return Alert(
+        id=alert_id,
+        server_name=server_name,
+        log_source=log_source,
+        rule=rule,
+        level=level,
+        message=message,
+        ip_address=ip_address,
+        username=username,
+        timestamp=_from_epoch_us(timestamp),
+        acknowledged=bool(acknowledged),
+        acknowledged_at=_from_epoch_us(acknowledged_at) if acknowledged_at is not None else None,
+        acknowledged_by=acknowledged_by
+    )
+
+
+# servers.logs holds the log list joined with the ASCII unit separator, which unlike
+# the comma used by older versions cannot appear in a path or journald unit name
+_LOGS_SEPARATOR = "\x1f"
+# PRAGMA user_version from which servers.logs uses _LOGS_SEPARATOR
+_LOGS_SEPARATOR_SCHEMA_VERSION = 1
+
+
+# Columns read back by _row_to_server / _row_to_exception (no SELECT *), which unpack
+# them by position so list queries can skip sqlite3.Row and use plain tuples
+_SERVER_COLUMNS = "id, name, host, port, username, password, private_key_path, logs"
+_EXCEPTION_COLUMNS = "id, rule_type, value, description, enabled, created_at, updated_at"
+
+
+def _row_to_server(row) -> Server:
+    server_id, name, host, port, username, password, private_key_path, logs = row
+    return Server(
+        id=server_id,
+        name=name,
+        host=host,
+        port=port,
+        username=username,
+        password=password,
+        private_key_path=private_key_path,
+        logs=logs.split(_LOGS_SEPARATOR) if logs else []
+    )
+
+
+_parse_iso = lru_cache(maxsize=1024)(datetime.fromisoformat)
+
+
+def _row_to_exception(row) -> AlertException:
+    exception_id, rule_type, value, description, enabled, created_at, updated_at = row
+    return AlertException(
+        id=exception_id,
+        rule_type=rule_type,
+        value=value,
+        description=description,
+        enabled=bool(enabled),
+        created_at=_parse_iso(created_at),
+        updated_at=_parse_iso(updated_at) if updated_at else None
+    )
+
+
+class _SQLiteRepository:
+    """Persistent-connection plumbing shared by the SQLite repositories.
+
+    Each repository keeps one connection for its lifetime instead of opening the
+    database on every call; a lock serialises the web and collector threads.
+    Reads check out a read-only connection from a small pool, which WAL lets run
+    alongside the writer and each other without taking that lock. The pool is not
+    per thread: the web server handles every request on a new thread.
+    """
+
+    # Idle read-only connections kept for reuse; extra ones opened while requests
+    # overlap are closed when handed back
+    READER_POOL_SIZE = 4
+
     def __init__(self, db_path: str):
         self._db_path = db_path
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._inode: Optional[int] = None
+        # (connection, database inode, generation); LIFO so the warmest connection is reused
+        self._readers: queue.LifoQueue = queue.LifoQueue(maxsize=self.READER_POOL_SIZE)
+        # Bumped by close() so readers checked out at that time are not pooled again
+        self._generation = 0
+        self._open()
+
+    def _init_db(self) -> None:
+        raise NotImplementedError
+
+    def _open(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = _connect(self._db_path)
+        self._inode = os.stat(self._db_path).st_ino
         self._init_db()
 
+    @contextmanager
+    def _get_connection(self):
+        with self._lock:
+            # The database file can be deleted and recreated from the UI; reopen (and
+            # recreate the schema) rather than keep writing to the unlinked file
+            try:
+                stale = os.stat(self._db_path).st_ino != self._inode
+            except FileNotFoundError:
+                stale = True
+            if stale or self._conn is None:
+                self._open()
+            try:
+                yield self._conn
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+                raise
+
+    @contextmanager
+    def _read_connection(self):
+        """Check out a pooled read-only connection, (re)opening it when the file changed."""
+        try:
+            inode = os.stat(self._db_path).st_ino
+        except FileNotFoundError:
+            inode = None
+        if inode is None or inode != self._inode:
+            # Missing or replaced file: let the writer recreate it and the schema first
+            with self._get_connection():
+                inode = self._inode
+        while True:
+            try:
+                conn, conn_inode, generation = self._readers.get_nowait()
+            except queue.Empty:
+                conn, conn_inode, generation = _connect(self._db_path, read_only=True), inode, self._generation
+                break
+            if conn_inode == inode and generation == self._generation:
+                break
+            conn.close()
+        try:
+            yield conn
+        finally:
+            pooled = False
+            if generation == self._generation:
+                try:
+                    self._readers.put_nowait((conn, conn_inode, generation))
+                    pooled = True
+                except queue.Full:
+                    pass
+            if not pooled:
+                conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._generation += 1
+            while True:
+                try:
+                    reader, _, _ = self._readers.get_nowait()
+                except queue.Empty:
+                    break
+                reader.close()
+
+
+class SQLiteAlertRepository(_SQLiteRepository, AlertRepository):
+    # Number of recent alert keys remembered for duplicate suppression
+    RECENT_KEYS_MAX = 10_000
+
+    def __init__(self, db_path: str):
+        self._recent_keys: OrderedDict = OrderedDict()
+        super().__init__(db_path)
+
     def _init_db(self):
         with self._get_connection() as conn:
+            _enable_wal(conn)
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS alerts (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -26,134 +339,169 @@ class SQLiteAlertRepository(AlertRepository):
                     message TEXT NOT NULL,
                     ip_address TEXT,
                     username TEXT,
-                    timestamp DATETIME NOT NULL,
+                    timestamp INTEGER NOT NULL,
                     acknowledged BOOLEAN DEFAULT FALSE,
-                    acknowledged_at DATETIME,
+                    acknowledged_at INTEGER,
                     acknowledged_by TEXT,
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
             """)
-            conn.commit()
-
-    @contextmanager
-    def _get_connection(self):
-        conn = sqlite3.connect(self._db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        finally:
-            conn.close()
+            self._migrate_text_timestamps(conn)
+            # Dashboard and collector queries filter on server or level and always sort newest first
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON alerts(timestamp DESC)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_server_ts ON alerts(server_name, timestamp DESC)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_level_ts ON alerts(level, timestamp DESC)")
+            # The dashboard's acknowledged / unacknowledged tabs
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_ack_ts ON alerts(acknowledged, timestamp DESC)")
+            # Give the planner statistics to choose between those indexes; only gathered
+            # once, later opens rely on PRAGMA optimize to refresh them when stale
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is None:
+                conn.execute("ANALYZE")
+            else:
+                conn.execute("PRAGMA optimize")
+
+    @staticmethod
+    def _migrate_text_timestamps(conn: sqlite3.Connection) -> None:
+        """Convert ISO-8601 TEXT timestamps written by older versions to epoch microseconds, in place.
+
+        Older databases declare these columns DATETIME; SQLite stores the integers
+        as-is there, so no table rebuild is needed and the pass is idempotent.
+        """
+        rows = conn.execute("""
+            SELECT id, timestamp, acknowledged_at FROM alerts
+            WHERE typeof(timestamp) = 'text' OR typeof(acknowledged_at) = 'text'
+        """).fetchall()
+        if not rows:
+            return
+        updates = []
+        for row_id, ts, ack_at in rows:
+            try:
+                if isinstance(ts, str):
+                    ts = _to_epoch_us(datetime.fromisoformat(ts))
+                if isinstance(ack_at, str):
+                    ack_at = _to_epoch_us(datetime.fromisoformat(ack_at))
+            except ValueError:
+                continue
+            updates.append((ts, ack_at, row_id))
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("UPDATE alerts SET timestamp = ?, acknowledged_at = ? WHERE id = ?", updates)
+        conn.execute("COMMIT")
 
     def save_alerts(self, alerts: Iterable[Alert]) -> int:
-        """Save multiple alerts and return count of saved alerts."""
-        saved_count = 0
-        with self._get_connection() as conn:
-            for alert in alerts:
-                cursor = conn.execute("""
-                    INSERT INTO alerts (server_name, log_source, rule, level, message, ip_address, username, timestamp, acknowledged, acknowledged_at, acknowledged_by)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    alert.server_name, alert.log_source, alert.rule, alert.level, alert.message,
-                    alert.ip_address, alert.username, alert.timestamp.isoformat(),
-                    alert.acknowledged, alert.acknowledged_at.isoformat() if alert.acknowledged_at else None,
-                    alert.acknowledged_by
-                ))
-                alert.id = cursor.lastrowid
-                saved_count += 1
-            conn.commit()
-        return saved_count
+        """Save multiple alerts and return count of saved alerts.
 
-    def list_alerts(self, server_name: Optional[str] = None, acknowledged: Optional[bool] = None, limit: Optional[int] = None) -> List[Alert]:
+        Only the alerts actually inserted get their id set; duplicates keep id None.
+        """
+        recent = self._recent_keys
         with self._get_connection() as conn:
-            query = "SELECT * FROM alerts WHERE 1=1"
+            new_alerts = []
+            new_keys = {}
+            for alert in alerts:
+                key = _alert_dedup_key(alert)
+                if key in recent:
+                    recent.move_to_end(key)
+                    continue
+                if key in new_keys:
+                    continue
+                new_keys[key] = None
+                new_alerts.append(alert)
+            if not new_alerts:
+                return 0
+            # Take the write lock up front: the whole batch is one transaction and one commit.
+            # Holding it, nobody else can insert, so the batch gets consecutive ids ending at
+            # last_insert_rowid() (AUTOINCREMENT only ever hands out max(rowid) + 1).
+            conn.execute("BEGIN IMMEDIATE")
+            rows = [_alert_to_row(alert) for alert in new_alerts]
+            tail = len(rows) % _INSERT_ALERT_CHUNK
+            for start in range(0, len(rows) - tail, _INSERT_ALERT_CHUNK):
+                conn.execute(_INSERT_ALERT_CHUNK_SQL,
+                             tuple(chain.from_iterable(rows[start:start + _INSERT_ALERT_CHUNK])))
+            if tail:
+                conn.executemany(_INSERT_ALERT_SQL, rows[len(rows) - tail:])
+            first_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0] - len(new_alerts) + 1
+            conn.execute("COMMIT")
+            # Remember the keys only once they are stored: a failed batch must not be
+            # mistaken for duplicates when it is retried
+            recent.update(new_keys)
+            while len(recent) > self.RECENT_KEYS_MAX:
+                recent.popitem(last=False)
+            for offset, alert in enumerate(new_alerts):
+                alert.id = first_id + offset
+        return len(new_alerts)
+
+    def list_alerts(self, server_name: Optional[str] = None, acknowledged: Optional[bool] = None, limit: Optional[int] = None,
+                    since: Optional[datetime] = None, level: Optional[str] = None, log_source: Optional[str] = None) -> List[Alert]:
+        # All filters are applied in SQL so LIMIT counts matching rows only
+        with self._read_connection() as conn:
             params = []
-            
             if server_name:
-                query += " AND server_name = ?"
                 params.append(server_name)
-            
             if acknowledged is not None:
-                query += " AND acknowledged = ?"
                 params.append(acknowledged)
-            
-            query += " ORDER BY timestamp DESC"
-            
+            if since is not None:
+                params.append(_to_epoch_us(since))
+            if level:
+                params.append(level)
+            if log_source:
+                params.append(log_source)
             if limit:
-                query += " LIMIT ?"
                 params.append(limit)
+            query = _list_alerts_sql(bool(server_name), acknowledged is not None, since is not None,
+                                     bool(level), bool(log_source), bool(limit))
             
-            cursor = conn.execute(query, params)
-            alerts = []
-            for row in cursor.fetchall():
-                alert = Alert(
-                    id=row['id'],
-                    server_name=row['server_name'],
-                    log_source=row['log_source'],
-                    rule=row['rule'],
-                    level=row['level'],
-                    message=row['message'],
-                    ip_address=row['ip_address'],
-                    username=row['username'],
-                    timestamp=datetime.fromisoformat(row['timestamp']),
-                    acknowledged=bool(row['acknowledged']),
-                    acknowledged_at=datetime.fromisoformat(row['acknowledged_at']) if row['acknowledged_at'] else None,
-                    acknowledged_by=row['acknowledged_by']
-                )
-                alerts.append(alert)
-            return alerts
+            # Rows become Alerts as the cursor steps: no sqlite3.Row objects, no intermediate list
+            cursor = conn.cursor()
+            cursor.row_factory = _alert_row_factory
+            return list(cursor.execute(query, params))
 
     def acknowledge_alert(self, alert_id: int, acknowledged_by: str) -> bool:
         with self._get_connection() as conn:
-            cursor = conn.execute("""
-                UPDATE alerts 
-                SET acknowledged = TRUE, acknowledged_at = ?, acknowledged_by = ?
-                WHERE id = ?
-            """, (datetime.utcnow().isoformat(), acknowledged_by, alert_id))
-            conn.commit()
+            cursor = conn.execute(_ACK_ALERT_SQL, (acknowledged_by, alert_id))
             return cursor.rowcount > 0
 
     def acknowledge_alerts_by_rule(self, rule: str, acknowledged_by: str) -> int:
         with self._get_connection() as conn:
-            cursor = conn.execute("""
-                UPDATE alerts 
-                SET acknowledged = TRUE, acknowledged_at = ?, acknowledged_by = ?
-                WHERE rule = ? AND acknowledged = FALSE
-            """, (datetime.utcnow().isoformat(), acknowledged_by, rule))
-            conn.commit()
+            cursor = conn.execute(_ACK_RULE_SQL, (acknowledged_by, rule))
             return cursor.rowcount
 
 
-class SQLiteStateRepository(StateRepository):
-    def __init__(self, db_path: str):
-        self._db_path = db_path
-        self._init_db()
+_CREATE_COLLECTION_STATE_SQL = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        server_name TEXT NOT NULL,
+        log_source TEXT NOT NULL,
+        last_position TEXT NOT NULL,
+        last_seen_timestamp TEXT NOT NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (server_name, log_source)
+    ) WITHOUT ROWID
+"""
 
+
+class SQLiteStateRepository(_SQLiteRepository, StateRepository):
     def _init_db(self):
         with self._get_connection() as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS collection_state (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    server_name TEXT NOT NULL,
-                    log_source TEXT NOT NULL,
-                    last_position TEXT NOT NULL,
-                    last_seen_timestamp TEXT NOT NULL,
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(server_name, log_source)
-                )
-            """)
-            conn.commit()
-
-    @contextmanager
-    def _get_connection(self):
-        conn = sqlite3.connect(self._db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        finally:
-            conn.close()
+            _enable_wal(conn)
+            # Keyed and always looked up by (server_name, log_source): a WITHOUT ROWID table
+            # stores rows in that key's b-tree, one lookup instead of index -> rowid -> row
+            conn.execute(_CREATE_COLLECTION_STATE_SQL.format(name="collection_state"))
+            columns = [row['name'] for row in conn.execute("PRAGMA table_info(collection_state)")]
+            if 'id' in columns:
+                # Databases from older versions have a surrogate id plus a UNIQUE index; the
+                # table holds one row per server and log, so rebuilding it is cheap
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(_CREATE_COLLECTION_STATE_SQL.format(name="collection_state_new"))
+                conn.execute("""
+                    INSERT OR REPLACE INTO collection_state_new
+                        (server_name, log_source, last_position, last_seen_timestamp, updated_at)
+                    SELECT server_name, log_source, last_position, last_seen_timestamp, updated_at
+                    FROM collection_state ORDER BY id
+                """)
+                conn.execute("DROP TABLE collection_state")
+                conn.execute("ALTER TABLE collection_state_new RENAME TO collection_state")
+                conn.execute("COMMIT")
 
     def get_last_seen_timestamp(self, server_name: str, log_source: str) -> Optional[str]:
-        with self._get_connection() as conn:
+        with self._read_connection() as conn:
             cursor = conn.execute("""
                 SELECT last_seen_timestamp FROM collection_state 
                 WHERE server_name = ? AND log_source = ?
@@ -171,20 +519,22 @@ class SQLiteStateRepository(StateRepository):
 
     def set_last_seen_timestamp(self, server_name: str, log_source: str, timestamp: str) -> None:
         with self._get_connection() as conn:
+            # Upsert in place: INSERT OR REPLACE would delete and re-insert the row
             conn.execute("""
-                INSERT OR REPLACE INTO collection_state (server_name, log_source, last_position, last_seen_timestamp, updated_at)
-                VALUES (?, ?, ?, ?, ?)
-            """, (server_name, log_source, "", timestamp, datetime.utcnow().isoformat()))
-            conn.commit()
+                INSERT INTO collection_state (server_name, log_source, last_position, last_seen_timestamp, updated_at)
+                VALUES (?, ?, '', ?, ?)
+                ON CONFLICT (server_name, log_source) DO UPDATE SET
+                    last_seen_timestamp = excluded.last_seen_timestamp,
+                    updated_at = excluded.updated_at
+            """, (server_name, log_source, timestamp, datetime.utcnow().isoformat()))
 
 
-class SQLiteServerRepository(ServerRepository):
-    def __init__(self, db_path: str):
-        self._db_path = db_path
-        self._init_db()
-
+class SQLiteServerRepository(_SQLiteRepository, ServerRepository):
     def _init_db(self):
+        # (reader, data_version, servers) of the last list_servers(); reset on (re)open
+        self._servers_cache: Optional[Tuple[sqlite3.Connection, int, List[Server]]] = None
         with self._get_connection() as conn:
+            _enable_wal(conn)
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS servers (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -199,21 +549,16 @@ class SQLiteServerRepository(ServerRepository):
                     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
             """)
-            conn.commit()
-
-    @contextmanager
-    def _get_connection(self):
-        conn = sqlite3.connect(self._db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        finally:
-            conn.close()
+            if conn.execute("PRAGMA user_version").fetchone()[0] < _LOGS_SEPARATOR_SCHEMA_VERSION:
+                # One-time conversion of the comma-joined lists written by older versions
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("UPDATE servers SET logs = replace(logs, ',', ?)", (_LOGS_SEPARATOR,))
+                conn.execute(f"PRAGMA user_version = {_LOGS_SEPARATOR_SCHEMA_VERSION}")
+                conn.execute("COMMIT")
 
     def save_server(self, server: Server) -> bool:
         with self._get_connection() as conn:
-            # Convert logs list to comma-separated string
-            logs_str = ','.join(server.logs) if server.logs else ''
+            logs_str = _LOGS_SEPARATOR.join(server.logs) if server.logs else ''
             
             if server.id:
                 # Update existing server
@@ -237,64 +582,75 @@ class SQLiteServerRepository(ServerRepository):
                     server.password, server.private_key_path, logs_str
                 ))
             
-            conn.commit()
+            self._servers_cache = None
             return True
 
     def get_server(self, name: str) -> Optional[Server]:
-        with self._get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT * FROM servers WHERE name = ?
+        with self._read_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT {_SERVER_COLUMNS} FROM servers WHERE name = ?
             """, (name,))
             row = cursor.fetchone()
-            if row:
-                # Parse logs back to list
-                logs = row['logs'].split(',') if row['logs'] else []
-                return Server(
-                    id=row['id'],
-                    name=row['name'],
-                    host=row['host'],
-                    port=row['port'],
-                    username=row['username'],
-                    password=row['password'],
-                    private_key_path=row['private_key_path'],
-                    logs=logs
-                )
-            return None
+            return _row_to_server(row) if row else None
 
     def list_servers(self) -> List[Server]:
-        with self._get_connection() as conn:
-            cursor = conn.execute("SELECT * FROM servers ORDER BY name")
-            servers = []
-            for row in cursor.fetchall():
-                # Parse logs back to list
-                logs = row['logs'].split(',') if row['logs'] else []
-                server = Server(
-                    id=row['id'],
-                    name=row['name'],
-                    host=row['host'],
-                    port=row['port'],
-                    username=row['username'],
-                    password=row['password'],
-                    private_key_path=row['private_key_path'],
-                    logs=logs
-                )
-                servers.append(server)
-            return servers
+        # The server list is read on every dashboard refresh and collection cycle but
+        # rarely changes. PRAGMA data_version moves when any other connection commits;
+        # it is per connection, so the cache only holds for the pooled reader that filled it.
+        with self._read_connection() as conn:
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            cache = self._servers_cache
+            if cache is None or cache[0] is not conn or cache[1] != version:
+                cursor = conn.cursor()
+                cursor.row_factory = None
+                cursor.execute(f"SELECT {_SERVER_COLUMNS} FROM servers ORDER BY name")
+                cache = self._servers_cache = (conn, version, [_row_to_server(row) for row in cursor])
+            # Callers get their own copies so they cannot alter the cached entities
+            return [replace(s, logs=list(s.logs)) for s in cache[2]]
 
     def delete_server(self, name: str) -> bool:
         with self._get_connection() as conn:
             cursor = conn.execute("DELETE FROM servers WHERE name = ?", (name,))
-            conn.commit()
+            self._servers_cache = None
             return cursor.rowcount > 0
 
 
-class SQLiteAlertExceptionRepository(AlertExceptionRepository):
-    def __init__(self, db_path: str):
-        self._db_path = db_path
-        self._init_db()
+# Alert field each exception rule_type is matched against (substring match)
+_EXCEPTION_FIELDS = {
+    "ip": "ip_address",
+    "username": "username",
+    "server": "server_name",
+    "log_source": "log_source",
+    "rule_pattern": "rule",
+}
+
+
+def _compile_exception_values(values: List[str]) -> Callable[[str], bool]:
+    """Return a predicate telling whether a field contains any of the values.
+
+    With pyahocorasick installed, several values are folded into one automaton so a
+    field is scanned once whatever the number of exceptions of that type.
+    """
+    if ahocorasick is not None and len(values) > 1 and all(values):
+        automaton = ahocorasick.Automaton()
+        for value in values:
+            automaton.add_word(value, value)
+        automaton.make_automaton()
+        return lambda field: next(automaton.iter(field), None) is not None
+    values = tuple(values)
+    return lambda field: any(value in field for value in values)
+
+
+class SQLiteAlertExceptionRepository(_SQLiteRepository, AlertExceptionRepository):
+    # How long the enabled exceptions are matched from memory before being re-read, so
+    # edits made through another connection (web UI vs collector) apply within this delay
+    EXCEPTIONS_TTL_SECONDS = 5.0
 
     def _init_db(self):
+        # (loaded_at, {rule_type: matcher}) of the enabled exceptions; reset on (re)open
+        self._exceptions_cache: Optional[Tuple[float, Dict[str, Callable[[str], bool]]]] = None
         with self._get_connection() as conn:
+            _enable_wal(conn)
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS alert_exceptions (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -306,16 +662,10 @@ class SQLiteAlertExceptionRepository(AlertExceptionRepository):
                     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
             """)
-            conn.commit()
-
-    @contextmanager
-    def _get_connection(self):
-        conn = sqlite3.connect(self._db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        finally:
-            conn.close()
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_exceptions_enabled_type
+                ON alert_exceptions(rule_type) WHERE enabled = TRUE
+            """)
 
     def save_exception(self, exception: AlertException) -> bool:
         with self._get_connection() as conn:
@@ -338,41 +688,21 @@ class SQLiteAlertExceptionRepository(AlertExceptionRepository):
                     exception.rule_type, exception.value, exception.description, exception.enabled
                 ))
             
-            conn.commit()
+            self._exceptions_cache = None
             return True
 
     def list_exceptions(self) -> List[AlertException]:
-        with self._get_connection() as conn:
-            cursor = conn.execute("SELECT * FROM alert_exceptions ORDER BY created_at DESC")
-            exceptions = []
-            for row in cursor.fetchall():
-                exception = AlertException(
-                    id=row['id'],
-                    rule_type=row['rule_type'],
-                    value=row['value'],
-                    description=row['description'],
-                    enabled=bool(row['enabled']),
-                    created_at=datetime.fromisoformat(row['created_at']),
-                    updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else None
-                )
-                exceptions.append(exception)
-            return exceptions
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f"SELECT {_EXCEPTION_COLUMNS} FROM alert_exceptions ORDER BY created_at DESC")
+            return [_row_to_exception(row) for row in cursor]
 
     def get_exception(self, exception_id: int) -> Optional[AlertException]:
-        with self._get_connection() as conn:
-            cursor = conn.execute("SELECT * FROM alert_exceptions WHERE id = ?", (exception_id,))
+        with self._read_connection() as conn:
+            cursor = conn.execute(f"SELECT {_EXCEPTION_COLUMNS} FROM alert_exceptions WHERE id = ?", (exception_id,))
             row = cursor.fetchone()
-            if row:
-                return AlertException(
-                    id=row['id'],
-                    rule_type=row['rule_type'],
-                    value=row['value'],
-                    description=row['description'],
-                    enabled=bool(row['enabled']),
-                    created_at=datetime.fromisoformat(row['created_at']),
-                    updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else None
-                )
-            return None
+            return _row_to_exception(row) if row else None
 
     def update_exception(self, exception: AlertException) -> bool:
         with self._get_connection() as conn:
@@ -384,35 +714,50 @@ class SQLiteAlertExceptionRepository(AlertExceptionRepository):
                 exception.rule_type, exception.value, exception.description,
                 exception.enabled, datetime.utcnow().isoformat(), exception.id
             ))
-            conn.commit()
+            self._exceptions_cache = None
             return cursor.rowcount > 0
 
     def delete_exception(self, exception_id: int) -> bool:
         with self._get_connection() as conn:
             cursor = conn.execute("DELETE FROM alert_exceptions WHERE id = ?", (exception_id,))
-            conn.commit()
+            self._exceptions_cache = None
             return cursor.rowcount > 0
 
+    def _enabled_exceptions(self) -> Dict[str, Callable[[str], bool]]:
+        """Matchers for the enabled exceptions by rule_type, re-read at most every EXCEPTIONS_TTL_SECONDS."""
+        cache = self._exceptions_cache
+        now = time.monotonic()
+        if cache is None or now - cache[0] > self.EXCEPTIONS_TTL_SECONDS:
+            grouped: Dict[str, list] = defaultdict(list)
+            with self._read_connection() as conn:
+                for rule_type, value in conn.execute(
+                        "SELECT rule_type, value FROM alert_exceptions WHERE enabled = TRUE"):
+                    if rule_type in _EXCEPTION_FIELDS:
+                        grouped[rule_type].append(value)
+            matchers = {rule_type: _compile_exception_values(values) for rule_type, values in grouped.items()}
+            cache = self._exceptions_cache = (now, matchers)
+        return cache[1]
+
     def is_alert_excepted(self, alert: Alert) -> bool:
-        with self._get_connection() as conn:
-            # Check all enabled exceptions
-            cursor = conn.execute("""
-                SELECT * FROM alert_exceptions WHERE enabled = TRUE
-            """)
-            
-            for row in cursor.fetchall():
-                rule_type = row['rule_type']
-                value = row['value']
-                
-                if rule_type == "ip" and alert.ip_address and value in alert.ip_address:
-                    return True
-                elif rule_type == "username" and alert.username and value in alert.username:
-                    return True
-                elif rule_type == "server" and value in alert.server_name:
-                    return True
-                elif rule_type == "log_source" and value in alert.log_source:
-                    return True
-                elif rule_type == "rule_pattern" and value in alert.rule:
-                    return True
-            
-            return False
+        # Called for every collected alert: match against the in-memory snapshot, not the table
+        for rule_type, matches in self._enabled_exceptions().items():
+            field = getattr(alert, _EXCEPTION_FIELDS[rule_type])
+            if field and matches(field):
+                return True
+        return False
+
+    def filter_excepted(self, alerts: List[Alert]) -> List[Alert]:
+        # One snapshot lookup for the whole batch; no exceptions means nothing to scan
+        checks = [(_EXCEPTION_FIELDS[rule_type], matches)
+                  for rule_type, matches in self._enabled_exceptions().items()]
+        if not checks:
+            return list(alerts)
+        kept = []
+        for alert in alerts:
+            for attr, matches in checks:
+                field = getattr(alert, attr)
+                if field and matches(field):
+                    break
+            else:
+                kept.append(alert)
+        return kept
@@ -1,16 +1,194 @@
 from __future__ import annotations
 
+import codecs
 import shlex
-from typing import List, Tuple
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
 
 import paramiko
 
 from config import ServerConfig
 
 
+_PoolKey = Tuple[str, int, str, int]
+_T = TypeVar("_T")
+
+# Stay under sshd's default MaxStartups (10) when many hosts are polled at once
+_MAX_CONCURRENT_HANDSHAKES = 8
+_MAX_FETCH_WORKERS = 32
+
+CAPABILITIES_TTL_SECONDS = 3600.0
+# (has_journal, preferred_unit, preferred_file)
+_Capabilities = Tuple[bool, str, str]
+
+# journalctl presence and os-release in one channel instead of two
+_PROBE_JOURNAL_MARK = "===J==="
+_PROBE_OS_MARK = "===O==="
+_PROBE_CMD = (
+    f"printf '{_PROBE_JOURNAL_MARK}\\n'; command -v journalctl >/dev/null 2>&1; echo $?; "
+    f"printf '{_PROBE_OS_MARK}\\n'; cat /etc/os-release 2>/dev/null || true"
+)
+_UNIT_MARK_PREFIX = "===U="
+
+
+# Command builders take the privilege prefix ("", "sudo -n " or "sudo -S -p '' ") and put it
+# in front of the log reader only: sudoers rules limited to tail/journalctl keep working,
+# and the shell, loops and grep around the reader always run as the login user.
+def _tail_cmd(sudo: str, log_path: str, tail_lines: int) -> str:
+    return f"{sudo}tail -n {int(tail_lines)} {shlex.quote(log_path)}"
+
+
+def _journal_cmd(sudo: str, unit_name: str, tail_lines: int) -> str:
+    return f"{sudo}journalctl -u {shlex.quote(unit_name)} -n {int(tail_lines)} --no-pager"
+
+
+def _journal_fallback_cmd(sudo: str, units: Tuple[str, ...], tail_lines: int) -> str:
+    """Try each unit in turn on the server; the first non-empty one is printed after a marker line."""
+    script = (
+        f"for u in {' '.join(shlex.quote(u) for u in units)}; do "
+        f"out=$({sudo}journalctl -u \"$u\" -n {int(tail_lines)} --no-pager) && [ -n \"$out\" ] && "
+        f"{{ printf '{_UNIT_MARK_PREFIX}%s\\n%s\\n' \"$u\" \"$out\"; exit 0; }}; "
+        "done; exit 1"
+    )
+    return f"sh -c {shlex.quote(script)}"
+
+_RECV_CHUNK = 65536
+# Characters str.splitlines() breaks on, so streamed output splits exactly like out.splitlines()
+_LINE_BREAKS = frozenset("\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029")
+
+
+def _iter_channel_lines(channel: paramiko.Channel) -> Iterator[str]:
+    """Yield stdout lines as they arrive, holding at most one chunk and a partial line."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    pending = ""
+    while True:
+        chunk = channel.recv(_RECV_CHUNK)
+        if not chunk:
+            break
+        text = pending + decoder.decode(chunk)
+        if not text:
+            continue
+        segments = text.splitlines(True)
+        last = segments[-1]
+        # Hold back an unterminated line, and a lone \r whose \n may be in the next chunk
+        if last[-1] not in _LINE_BREAKS or last[-1] == "\r":
+            pending = segments.pop()
+        else:
+            pending = ""
+        for segment in segments:
+            yield segment[:-2] if segment.endswith("\r\n") else segment[:-1]
+    yield from (pending + decoder.decode(b"", final=True)).splitlines()
+
+
+def _tail_grep_cmd(sudo: str, log_path: str, tail_lines: int, patterns: Iterable[str]) -> str:
+    """tail piped through grep -E -i, keeping tail's failure status so privilege fallback still triggers."""
+    grep_args = " ".join(f"-e {shlex.quote(p)}" for p in patterns)
+    script = (
+        f"out=$({_tail_cmd(sudo, log_path, tail_lines)}) || exit $?; "
+        f"printf '%s\\n' \"$out\" | grep -E -i {grep_args}; [ $? -le 1 ]"
+    )
+    return f"sh -c {shlex.quote(script)}"
+
+
+def _pool_key(server: ServerConfig) -> _PoolKey:
+    # Hash the credential so the password never sits in the pool's key table
+    return (server.host, server.port, server.username, hash(server.private_key_path or server.password))
+
+
+class _SSHPool:
+    """Keeps idle authenticated connections per server so each fetch skips TCP+KEX+auth."""
+
+    def __init__(self, connect: Callable[[ServerConfig], paramiko.SSHClient], max_per_key: int = 4) -> None:
+        self._connect = connect
+        self._max_per_key = max_per_key
+        self._lock = threading.Lock()
+        self._idle: Dict[_PoolKey, Deque[paramiko.SSHClient]] = {}
+        self._keys: Dict[int, _PoolKey] = {}
+
+    def acquire(self, server: ServerConfig) -> paramiko.SSHClient:
+        key = _pool_key(server)
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                client = idle.pop() if idle else None
+            if client is None:
+                break
+            try:
+                transport = client.get_transport()
+                if transport is not None and transport.is_active():
+                    transport.send_ignore()
+                    return client
+            except Exception:
+                pass
+            self.discard(client)
+        client = self._connect(server)
+        with self._lock:
+            self._keys[id(client)] = key
+        return client
+
+    def release(self, client: paramiko.SSHClient) -> None:
+        with self._lock:
+            key = self._keys.get(id(client))
+            if key is not None:
+                idle = self._idle.setdefault(key, deque())
+                if len(idle) < self._max_per_key:
+                    idle.append(client)
+                    return
+        self.discard(client)
+
+    def discard(self, client: paramiko.SSHClient) -> None:
+        with self._lock:
+            self._keys.pop(id(client), None)
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            clients = [client for idle in self._idle.values() for client in idle]
+            self._idle.clear()
+        for client in clients:
+            self.discard(client)
+
+
 class SSHLogClient:
-    def __init__(self, timeout_seconds: int = 10) -> None:
+    def __init__(self, timeout_seconds: int = 10, max_per_key: int = 4) -> None:
         self._timeout = timeout_seconds
+        self._startup_sem = threading.BoundedSemaphore(_MAX_CONCURRENT_HANDSHAKES)
+        self._pool = _SSHPool(self._throttled_connect, max_per_key)
+        self._executor = ThreadPoolExecutor(max_workers=_MAX_FETCH_WORKERS, thread_name_prefix="ssh-fetch")
+        self._caps_lock = threading.Lock()
+        self._caps_cache: Dict[Tuple[str, int], Tuple[float, _Capabilities]] = {}
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._pool.close()
+
+    def fetch_many(self, calls: Iterable[Callable[[], _T]]) -> List[Future[_T]]:
+        """Run fetch calls concurrently; futures come back in submission order."""
+        return [self._executor.submit(call) for call in calls]
+
+    def _throttled_connect(self, server: ServerConfig) -> paramiko.SSHClient:
+        # Only new handshakes are throttled: pooled connections are reused freely
+        with self._startup_sem:
+            return self._connect(server)
+
+    @contextmanager
+    def _acquire(self, server: ServerConfig) -> Iterator[paramiko.SSHClient]:
+        client = self._pool.acquire(server)
+        try:
+            yield client
+        except BaseException:
+            # The channel may be half-read or the transport dead: never hand it out again
+            self._pool.discard(client)
+            raise
+        self._pool.release(client)
 
     def _connect(self, server: ServerConfig) -> paramiko.SSHClient:
         client = paramiko.SSHClient()
@@ -64,121 +242,124 @@ class SSHLogClient:
         print(f"Successfully connected to {server.host}")
         return client
 
-    def _exec(self, client: paramiko.SSHClient, cmd: str) -> Tuple[str, str, int]:
+    def _exec(self, client: paramiko.SSHClient, cmd: str, stdin_data: Optional[str] = None) -> Tuple[List[str], str, int]:
         stdin, stdout, stderr = client.exec_command(cmd, timeout=self._timeout)
-        out = stdout.read().decode("utf-8", errors="ignore")
-        err = stderr.read().decode("utf-8", errors="ignore")
+        if stdin_data is not None:
+            try:
+                stdin.write(stdin_data)
+                stdin.flush()
+            except Exception:
+                pass
+        # Drain stderr alongside stdout so unread error output cannot fill the channel window
+        err_chunks: List[bytes] = []
+        drain = threading.Thread(target=lambda: err_chunks.append(stderr.read()), daemon=True)
+        drain.start()
+        lines = list(_iter_channel_lines(stdout.channel))
         exit_status = stdout.channel.recv_exit_status()
-        return out, err, exit_status
+        drain.join(self._timeout)
+        err = b"".join(err_chunks).decode("utf-8", errors="ignore")
+        return lines, err, exit_status
 
-    def _exec_with_sudo_n(self, client: paramiko.SSHClient, cmd: str) -> Tuple[str, str, int]:
-        return self._exec(client, f"sudo -n {cmd}")
+    def _exec_with_sudo_n(self, client: paramiko.SSHClient, build: Callable[[str], str]) -> Tuple[List[str], str, int]:
+        return self._exec(client, build("sudo -n "))
 
-    def _exec_with_sudo_password(self, client: paramiko.SSHClient, cmd: str, password: str) -> Tuple[str, str, int]:
-        # Use -S to read password from stdin; -p '' to suppress prompt text
-        stdin, stdout, stderr = client.exec_command(f"sudo -S -p '' {cmd}", timeout=self._timeout)
-        try:
-            stdin.write(password + "\n")
-            stdin.flush()
-        except Exception:
-            pass
-        out = stdout.read().decode("utf-8", errors="ignore")
-        err = stderr.read().decode("utf-8", errors="ignore")
-        exit_status = stdout.channel.recv_exit_status()
-        return out, err, exit_status
+    def _exec_with_sudo_password(self, client: paramiko.SSHClient, build: Callable[[str], str], password: str,
+                                 readers: int = 1) -> Tuple[List[str], str, int]:
+        # Use -S to read password from stdin; -p '' to suppress prompt text. sudo reads one
+        # line per invocation, so each reader the command may run gets its own copy
+        return self._exec(client, build("sudo -S -p '' "), stdin_data=(password + "\n") * readers)
 
-    def _exec_auto_privileged(self, client: paramiko.SSHClient, server: ServerConfig, cmd: str) -> Tuple[str, int]:
-        out, err, code = self._exec(client, cmd)
+    def _exec_auto_privileged(self, client: paramiko.SSHClient, server: ServerConfig, build: Callable[[str], str],
+                              readers: int = 1) -> Tuple[List[str], int]:
+        """Run build(""), then retry with sudo put in front of the log reader(s) only."""
+        out, err, code = self._exec(client, build(""))
         if code == 0:
             return out, code
         # Try sudo -n (non-interactive)
-        out2, err2, code2 = self._exec_with_sudo_n(client, cmd)
+        out2, err2, code2 = self._exec_with_sudo_n(client, build)
         if code2 == 0:
             return out2, code2
         # Try sudo with password if we have one
         if server.password:
-            out3, err3, code3 = self._exec_with_sudo_password(client, cmd, server.password)
+            out3, err3, code3 = self._exec_with_sudo_password(client, build, server.password, readers)
             return out3, code3
         return out, code
 
-    def fetch_tail(self, server: ServerConfig, log_path: str, tail_lines: int = 2000) -> List[str]:
-        client = None
-        try:
-            client = self._connect(server)
-            quoted_path = shlex.quote(log_path)
-            cmd = f"tail -n {int(tail_lines)} {quoted_path}"
-            out, _ = self._exec_auto_privileged(client, server, cmd)
-            return out.splitlines()
-        finally:
-            try:
-                if client is not None:
-                    client.close()
-            except Exception:
-                pass
+    def fetch_tail(self, server: ServerConfig, log_path: str, tail_lines: int = 2000, patterns: Optional[Iterable[str]] = None) -> List[str]:
+        with self._acquire(server) as client:
+            if patterns:
+                # Filter on the host so lines no rule can match never cross the wire
+                build = partial(_tail_grep_cmd, log_path=log_path, tail_lines=tail_lines, patterns=tuple(patterns))
+            else:
+                build = partial(_tail_cmd, log_path=log_path, tail_lines=tail_lines)
+            lines, _ = self._exec_auto_privileged(client, server, build)
+            return lines
 
     def fetch_journal_unit_tail(self, server: ServerConfig, unit_name: str, tail_lines: int = 2000) -> List[str]:
-        client = None
-        try:
-            client = self._connect(server)
-            quoted_unit = shlex.quote(unit_name)
-            cmd = f"journalctl -u {quoted_unit} -n {int(tail_lines)} --no-pager"
-            out, _ = self._exec_auto_privileged(client, server, cmd)
-            return out.splitlines()
-        finally:
-            try:
-                if client is not None:
-                    client.close()
-            except Exception:
-                pass
+        with self._acquire(server) as client:
+            build = partial(_journal_cmd, unit_name=unit_name, tail_lines=tail_lines)
+            lines, _ = self._exec_auto_privileged(client, server, build)
+            return lines
+
+    def _detect_capabilities(self, client: paramiko.SSHClient) -> _Capabilities:
+        probe_lines, _, _ = self._exec(client, _PROBE_CMD)
+        out_probe = "\n".join(probe_lines)
+        _, _, probe = out_probe.partition(_PROBE_JOURNAL_MARK)
+        out_j, _, out_os = probe.partition(_PROBE_OS_MARK)
+
+        # Detect presence of journalctl
+        has_journal = out_j.strip().endswith("0")
+
+        # Parse /etc/os-release
+        os_id = ""
+        os_like = ""
+        for line in out_os.splitlines():
+            if line.startswith("ID="):
+                os_id = line.split("=", 1)[1].strip().strip('"')
+            elif line.startswith("ID_LIKE="):
+                os_like = line.split("=", 1)[1].strip().strip('"')
+        like_lower = os_like.lower()
+        is_debian_family = (
+            os_id.lower() in {"debian", "ubuntu", "raspbian"}
+            or "debian" in like_lower
+            or "ubuntu" in like_lower
+        )
+
+        preferred_unit = "ssh" if is_debian_family else "sshd"
+        preferred_file = "/var/log/auth.log" if is_debian_family else "/var/log/secure"
+        return has_journal, preferred_unit, preferred_file
 
     def fetch_ssh_auto(self, server: ServerConfig, tail_lines: int = 2000) -> Tuple[List[str], str]:
-        client = None
-        try:
-            client = self._connect(server)
-            # Detect presence of journalctl
-            out_j, _, code_j = self._exec(client, "command -v journalctl >/dev/null 2>&1; echo $?")
-            has_journal = out_j.strip().endswith("0")
-
-            # Parse /etc/os-release
-            out_os, _, _ = self._exec(client, "cat /etc/os-release 2>/dev/null || true")
-            os_id = ""
-            os_like = ""
-            for line in out_os.splitlines():
-                if line.startswith("ID="):
-                    os_id = line.split("=", 1)[1].strip().strip('"')
-                elif line.startswith("ID_LIKE="):
-                    os_like = line.split("=", 1)[1].strip().strip('"')
-            like_lower = os_like.lower()
-            is_debian_family = (
-                os_id.lower() in {"debian", "ubuntu", "raspbian"}
-                or "debian" in like_lower
-                or "ubuntu" in like_lower
-            )
-
-            preferred_unit = "ssh" if is_debian_family else "sshd"
-            preferred_file = "/var/log/auth.log" if is_debian_family else "/var/log/secure"
+        caps_key = (server.host, server.port)
+        with self._acquire(server) as client:
+            # journald presence and distro family only change with an OS upgrade
+            with self._caps_lock:
+                cached = self._caps_cache.get(caps_key)
+            if cached is not None and time.monotonic() - cached[0] < CAPABILITIES_TTL_SECONDS:
+                caps = cached[1]
+            else:
+                caps = self._detect_capabilities(client)
+                with self._caps_lock:
+                    self._caps_cache[caps_key] = (time.monotonic(), caps)
+            has_journal, preferred_unit, preferred_file = caps
 
             if has_journal:
-                quoted_unit = shlex.quote(preferred_unit)
-                out, code = self._exec_auto_privileged(client, server, f"journalctl -u {quoted_unit} -n {int(tail_lines)} --no-pager")
-                if code == 0 and out:
-                    return out.splitlines(), f"journal:{preferred_unit}"
                 alt_unit = "sshd" if preferred_unit == "ssh" else "ssh"
-                quoted_alt = shlex.quote(alt_unit)
-                out, code = self._exec_auto_privileged(client, server, f"journalctl -u {quoted_alt} -n {int(tail_lines)} --no-pager")
-                if code == 0 and out:
-                    return out.splitlines(), f"journal:{alt_unit}"
+                units = (preferred_unit, alt_unit)
+                build = partial(_journal_fallback_cmd, units=units, tail_lines=tail_lines)
+                lines, code = self._exec_auto_privileged(client, server, build, readers=len(units))
+                if code == 0 and lines and lines[0].startswith(_UNIT_MARK_PREFIX):
+                    header = lines.pop(0)
+                    return lines, f"journal:{header[len(_UNIT_MARK_PREFIX):]}"
 
-            out, code = self._exec_auto_privileged(client, server, f"tail -n {int(tail_lines)} {shlex.quote(preferred_file)}")
-            if code == 0 and out:
-                return out.splitlines(), preferred_file
+            lines, code = self._exec_auto_privileged(
+                client, server, partial(_tail_cmd, log_path=preferred_file, tail_lines=tail_lines))
+            if code == 0 and lines:
+                return lines, preferred_file
 
+            # The cached guess led nowhere: detect again on the next poll
+            with self._caps_lock:
+                self._caps_cache.pop(caps_key, None)
             alt_file = "/var/log/secure" if preferred_file.endswith("auth.log") else "/var/log/auth.log"
-            out, _ = self._exec_auto_privileged(client, server, f"tail -n {int(tail_lines)} {shlex.quote(alt_file)}")
-            return out.splitlines(), alt_file
-        finally:
-            try:
-                if client is not None:
-                    client.close()
-            except Exception:
-                pass
+            lines, _ = self._exec_auto_privileged(client, server, partial(_tail_cmd, log_path=alt_file, tail_lines=tail_lines))
+            return lines, alt_file
@@ -1,27 +1,132 @@
 from __future__ import annotations
 
 from datetime import datetime
+import gzip
 import logging
 import os
-from typing import Optional
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
 from flask import Flask, jsonify, request, Response, send_from_directory, redirect, render_template
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json is used otherwise
+    orjson = None
 
 from config import AppConfig
 from infrastructure.persistence.sqlite_repositories import SQLiteAlertRepository, SQLiteServerRepository, SQLiteAlertExceptionRepository
-from domain.entities import Server
+from domain.entities import Alert, Server
 from scheduler import CollectorThread
 
 
+def _alert_to_dict(a: Alert) -> dict:
+    """JSON-ready representation of an alert for the API."""
+    return {
+        "id": a.id,
+        "server_name": a.server_name,
+        "source_log": a.log_source,
+        "timestamp": a.timestamp.isoformat(),
+        "level": a.level,
+        "message": a.message,
+        "ip_address": a.ip_address,
+        "rule": a.rule,
+        "acknowledged": a.acknowledged,
+        "acknowledged_at": a.acknowledged_at.isoformat() if a.acknowledged_at else None,
+        "acknowledged_by": a.acknowledged_by,
+    }
+
+
+LIST_CACHE_TTL_SECONDS = 1.0
+_LIST_CACHE_MAX_ENTRIES = 256
+
+
+class _TTLCache:
+    """Short-lived memo for read-only endpoints polled by dashboards.
+
+    invalidate() bumps a generation so a load that raced a write is not stored.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and now - hit[0] < self._ttl:
+                return hit[1]
+            generation = self._generation
+        value = load()
+        with self._lock:
+            if generation == self._generation:
+                if len(self._entries) >= _LIST_CACHE_MAX_ENTRIES:
+                    self._entries.clear()
+                self._entries[key] = (now, value)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+class _ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (single C pass, native datetime support).
+
+    Calls with options orjson cannot reproduce are handed to the stdlib provider.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        indent = kwargs.get("indent")
+        if (kwargs.keys() - {"sort_keys", "indent", "separators"} or indent not in (None, 2)
+                or kwargs.get("separators") not in (None, (",", ":"))):
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_SORT_KEYS if kwargs.get("sort_keys", self.sort_keys) else 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
 def create_app(cfg: AppConfig, collector: Optional[CollectorThread] = None) -> Flask:
     # Get the project root directory (where templates/ is located)
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     app = Flask(__name__, 
                 template_folder=os.path.join(project_root, "templates"),
                 static_folder=os.path.join(project_root, "static"))
+    if orjson is not None:
+        app.json = _ORJSONProvider(app)
     alert_repo = SQLiteAlertRepository(cfg.storage.sqlite_path)
     server_repo = SQLiteServerRepository(cfg.storage.sqlite_path)
     exception_repo = SQLiteAlertExceptionRepository(cfg.storage.sqlite_path)
     log = logging.getLogger("Web")
+    # Identical list requests within the TTL share one query; writes made here show up at once
+    list_cache = _TTLCache(LIST_CACHE_TTL_SECONDS)
+    # Pages only vary by active_page: render each once and keep a pre-gzipped copy
+    page_cache: Dict[str, Tuple[bytes, bytes]] = {}
+
+    def _page(template: str, active_page: str) -> Response:
+        cached = page_cache.get(template)
+        if cached is None:
+            html = render_template(template, active_page=active_page).encode("utf-8")
+            cached = page_cache[template] = (html, gzip.compress(html, 9))
+        html, html_gz = cached
+        if "gzip" in request.accept_encodings:
+            response = Response(html_gz, mimetype="text/html")
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = Response(html, mimetype="text/html")
+        response.vary.add("Accept-Encoding")
+        return response
 
 
 
@@ -130,10 +235,10 @@ def create_app(cfg: AppConfig, collector: Optional[CollectorThread] = None) -> F
                 if "to_addrs" in email_data:
                     cfg.email.to_addrs = email_data["to_addrs"]
                 
-                # Update notifier with new email config
-                if collector and hasattr(collector, '_notifier'):
-                    from infrastructure.notifiers.email_notifier import EmailNotifier
-                    collector._notifier = EmailNotifier(cfg.email)
+                # Update notifier with new email config; the collector swaps it in between
+                # cycles and drains the old one in the background, so this does not block
+                if collector and hasattr(collector, 'update_email_config'):
+                    collector.update_email_config(cfg.email)
             
             log.info("Configuration updated successfully")
             return jsonify({"message": "Configuration updated successfully"})
@@ -226,32 +331,32 @@ def create_app(cfg: AppConfig, collector: Optional[CollectorThread] = None) -> F
     @app.get("/dashboard")
     def dashboard() -> Response:
         """Dashboard page with statistics and quick actions."""
-        return render_template("dashboard.html", active_page="dashboard")
+        return _page("dashboard.html", "dashboard")
 
     @app.get("/alerts")
     def alerts_page() -> Response:
         """Alerts page with filtering and management."""
-        return render_template("alerts.html", active_page="alerts")
+        return _page("alerts.html", "alerts")
 
     @app.get("/process-monitoring")
     def process_monitoring_page() -> Response:
         """Process monitoring page with real-time process alerts."""
-        return render_template("process_monitoring.html", active_page="process-monitoring")
+        return _page("process_monitoring.html", "process-monitoring")
 
     @app.get("/servers")
     def servers_page() -> Response:
         """Server management page."""
-        return render_template("servers.html", active_page="servers")
+        return _page("servers.html", "servers")
 
     @app.get("/exceptions")
     def exceptions_page() -> Response:
         """Alert exceptions management page."""
-        return render_template("exceptions.html", active_page="exceptions")
+        return _page("exceptions.html", "exceptions")
 
     @app.get("/settings")
     def settings_page() -> Response:
         """Settings page for application configuration."""
-        return render_template("settings.html", active_page="settings")
+        return _page("settings.html", "settings")
 
     # API routes
     @app.get("/api/alerts")
@@ -269,33 +374,18 @@ def create_app(cfg: AppConfig, collector: Optional[CollectorThread] = None) -> F
         elif acknowledged_filter == "false":
             acknowledged = False
         
-        alerts = alert_repo.list_alerts(limit=limit, acknowledged=acknowledged)
-        
-        # Apply filters
-        if server_filter:
-            alerts = [a for a in alerts if a.server_name == server_filter]
-        if level_filter:
-            alerts = [a for a in alerts if a.level == level_filter]
-        if log_source_filter:
-            alerts = [a for a in alerts if a.log_source == log_source_filter]
-        
-        data = [
-            {
-                "id": a.id,
-                "server_name": a.server_name,
-                "source_log": a.log_source,
-                "timestamp": a.timestamp.isoformat(),
-                "level": a.level,
-                "message": a.message,
-                "ip_address": a.ip_address,
-                "rule": a.rule,
-                "acknowledged": a.acknowledged,
-                "acknowledged_at": a.acknowledged_at.isoformat() if a.acknowledged_at else None,
-                "acknowledged_by": a.acknowledged_by,
-            }
-            for a in alerts
-        ]
-        return jsonify(data)
+        def load() -> list:
+            alerts = alert_repo.list_alerts(
+                server_name=server_filter,
+                acknowledged=acknowledged,
+                limit=limit,
+                level=level_filter,
+                log_source=log_source_filter,
+            )
+            return [_alert_to_dict(a) for a in alerts]
+
+        key = ("alerts", limit, server_filter, acknowledged, level_filter, log_source_filter)
+        return jsonify(list_cache.get(key, load))
 
     @app.get("/api/process-monitoring")
     def get_process_monitoring_alerts() -> Response:
@@ -310,31 +400,18 @@ def create_app(cfg: AppConfig, collector: Optional[CollectorThread] = None) -> F
         elif acknowledged_filter == "false":
             acknowledged = False
         
-        # Get all alerts and filter for process monitoring
-        all_alerts = alert_repo.list_alerts(limit=1000, acknowledged=acknowledged)
-        process_alerts = [a for a in all_alerts if a.log_source in ['process_monitoring', 'file_monitoring']]
-        
-        # Apply limit after filtering
-        if limit:
-            process_alerts = process_alerts[:limit]
-        
-        data = [
-            {
-                "id": a.id,
-                "server_name": a.server_name,
-                "source_log": a.log_source,
-                "timestamp": a.timestamp.isoformat(),
-                "level": a.level,
-                "message": a.message,
-                "ip_address": a.ip_address,
-                "rule": a.rule,
-                "acknowledged": a.acknowledged,
-                "acknowledged_at": a.acknowledged_at.isoformat() if a.acknowledged_at else None,
-                "acknowledged_by": a.acknowledged_by,
-            }
-            for a in process_alerts
-        ]
-        return jsonify(data)
+        def load() -> list:
+            # Get all alerts and filter for process monitoring
+            all_alerts = alert_repo.list_alerts(limit=1000, acknowledged=acknowledged)
+            process_alerts = [a for a in all_alerts if a.log_source in ['process_monitoring', 'file_monitoring']]
+
+            # Apply limit after filtering
+            if limit:
+                process_alerts = process_alerts[:limit]
+
+            return [_alert_to_dict(a) for a in process_alerts]
+
+        return jsonify(list_cache.get(("process_monitoring", limit, acknowledged), load))
 
     @app.post("/api/alerts/<int:alert_id>/acknowledge")
     def acknowledge_alert(alert_id: int) -> Response:
@@ -342,6 +419,7 @@ def create_app(cfg: AppConfig, collector: Optional[CollectorThread] = None) -> F
         acknowledged_by = body.get("acknowledged_by", "web_user")
         
         success = alert_repo.acknowledge_alert(alert_id, acknowledged_by)
+        list_cache.invalidate()
         if success:
             log.info("Alert %d acknowledged by %s", alert_id, acknowledged_by)
             return jsonify({"status": "ok"})
@@ -358,26 +436,29 @@ def create_app(cfg: AppConfig, collector: Optional[CollectorThread] = None) -> F
             return jsonify({"error": "Rule parameter required"}), 400
         
         count = alert_repo.acknowledge_alerts_by_rule(rule, acknowledged_by)
+        list_cache.invalidate()
         log.info("Acknowledged %d alerts with rule %s by %s", count, rule, acknowledged_by)
         return jsonify({"status": "ok", "acknowledged_count": count})
 
     @app.get("/api/servers")
     def list_servers() -> Response:
-        servers = server_repo.list_servers()
-        log.debug("List servers (%d)", len(servers))
-        data = [
-            {
-                "name": s.name,
-                "host": s.host,
-                "port": s.port,
-                "username": s.username,
-                "private_key_path": s.private_key_path,
-                "logs": s.logs or [],
-                "has_password": bool(s.password),
-            }
-            for s in servers
-        ]
-        return jsonify(data)
+        def load() -> list:
+            servers = server_repo.list_servers()
+            log.debug("List servers (%d)", len(servers))
+            return [
+                {
+                    "name": s.name,
+                    "host": s.host,
+                    "port": s.port,
+                    "username": s.username,
+                    "private_key_path": s.private_key_path,
+                    "logs": s.logs or [],
+                    "has_password": bool(s.password),
+                }
+                for s in servers
+            ]
+
+        return jsonify(list_cache.get(("servers",), load))
 
     @app.post("/api/servers")
     def add_server() -> Response:
@@ -399,6 +480,7 @@ def create_app(cfg: AppConfig, collector: Optional[CollectorThread] = None) -> F
             logs=list(logs),
         )
         server_repo.save_server(srv)
+        list_cache.invalidate()
         log.info("Upserted server %s (%s:%s)", srv.name, srv.host, srv.port)
         if collector is not None:
             collector.trigger_refresh()
@@ -407,6 +489,7 @@ def create_app(cfg: AppConfig, collector: Optional[CollectorThread] = None) -> F
     @app.delete("/api/servers/<name>")
     def delete_server(name: str) -> Response:
         server_repo.delete_server(name)
+        list_cache.invalidate()
         log.info("Deleted server %s", name)
         if collector is not None:
             collector.trigger_refresh()
@@ -496,6 +579,7 @@ def create_app(cfg: AppConfig, collector: Optional[CollectorThread] = None) -> F
             alert_repo = SQLiteAlertRepository(db_path)
             server_repo = SQLiteServerRepository(db_path)
             exception_repo = SQLiteAlertExceptionRepository(db_path)
+            list_cache.invalidate()
             
             log.info("Database recreated successfully with fresh tables")
             return jsonify({"message": "Database recreated successfully"})
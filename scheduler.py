@@ -4,9 +4,10 @@ import threading
 import time
 import logging
 from datetime import datetime, timedelta
-from typing import List
+from functools import partial
+from typing import List, Optional, Tuple
 
-from config import AppConfig
+from config import AppConfig, EmailConfig
 from infrastructure.ssh.ssh_client import SSHLogClient
 from infrastructure.persistence.sqlite_repositories import (
     SQLiteAlertRepository,
@@ -15,7 +16,7 @@ from infrastructure.persistence.sqlite_repositories import (
     SQLiteAlertExceptionRepository,
 )
 from infrastructure.notifiers.email_notifier import EmailNotifier
-from use_cases.detect_security_events import detect_alerts
+from use_cases.detect_security_events import PREFILTER_PATTERNS, detect_alerts
 from use_cases.process_monitoring import run_process_monitoring
 from domain.entities import Server
 
@@ -32,6 +33,9 @@ class CollectorThread(threading.Thread):
         self._server_repo = SQLiteServerRepository(cfg.storage.sqlite_path)
         self._exception_repo = SQLiteAlertExceptionRepository(cfg.storage.sqlite_path)
         self._notifier = EmailNotifier(cfg.email)
+        # Set from the web thread by update_email_config(), swapped in by run() between cycles
+        self._notifier_lock = threading.Lock()
+        self._pending_notifier: Optional[EmailNotifier] = None
         self._log = logging.getLogger(self.__class__.__name__)
         self._last_check_time = None
         self._next_check_time = None
@@ -56,6 +60,26 @@ class CollectorThread(threading.Thread):
         self._cfg = new_cfg
         self._log.info("Configuration updated: new poll interval = %d seconds", new_cfg.poll_interval_seconds)
 
+    def update_email_config(self, email_cfg: EmailConfig) -> None:
+        """Send notifications with email_cfg from the next collection cycle on.
+
+        Returns immediately: the collector swaps notifiers between cycles, so nothing it
+        queues lands on a closed one, and the old notifier is drained in the background.
+        """
+        notifier = EmailNotifier(email_cfg)
+        with self._notifier_lock:
+            superseded, self._pending_notifier = self._pending_notifier, notifier
+        if superseded is not None:
+            _close_in_background(superseded)
+
+    def _apply_pending_notifier(self) -> None:
+        with self._notifier_lock:
+            notifier, self._pending_notifier = self._pending_notifier, None
+        if notifier is not None:
+            previous, self._notifier = self._notifier, notifier
+            _close_in_background(previous)
+            self._log.info("Email notifier replaced with the updated configuration")
+
     def _seed_servers_if_needed(self) -> None:
         existing = self._server_repo.list_servers()
         if not existing and self._cfg.servers:
@@ -119,6 +143,15 @@ class CollectorThread(threading.Thread):
         
         return filtered_alerts
 
+    def _fetch_source(self, server_cfg, source: str) -> Tuple[List[str], str]:
+        tail_lines = self._cfg.collection.tail_lines
+        if source == "ssh:auto":
+            return self._ssh.fetch_ssh_auto(server_cfg, tail_lines)
+        if source.startswith("journal:"):
+            unit = source.split(":", 1)[1]
+            return self._ssh.fetch_journal_unit_tail(server_cfg, unit, tail_lines), f"journal:{unit}"
+        return self._ssh.fetch_tail(server_cfg, source, tail_lines, PREFILTER_PATTERNS), source
+
     def stop(self) -> None:
         self._stop_event.set()
         self._wake_event.set()
@@ -129,6 +162,7 @@ class CollectorThread(threading.Thread):
         
         while not self._stop_event.is_set():
             cycle_start = time.time()
+            self._apply_pending_notifier()
             self._last_check_time = datetime.utcnow()
             self._next_check_time = self._last_check_time + timedelta(seconds=self._cfg.poll_interval_seconds)
             
@@ -142,128 +176,141 @@ class CollectorThread(threading.Thread):
             servers = self._server_repo.list_servers()
             self._log.debug("Collecting from %d server(s)", len(servers))
 
+            jobs = []
             for server in servers:
                 sources = server.logs or ["ssh:auto"]
                 self._log.debug("Server %s sources: %s", server.name, sources)
+                server_cfg = _to_serverconfig(server)
                 for source in sources:
+                    jobs.append((server, source, partial(self._fetch_source, server_cfg, source)))
+
+            # Fetch every source in parallel, then analyse and persist serially on this thread
+            futures = self._ssh.fetch_many(call for _, _, call in jobs)
+            for (server, source, _), future in zip(jobs, futures):
+                try:
+                    lines, log_identifier = future.result()
+                    self._log.debug("Fetched %d lines from %s:%s", len(lines), server.name, log_identifier)
+                except Exception as e:
+                    self._log.warning("Fetch failed for %s %s: %s", server.name, source, e)
+                    continue
+
+                last_ts_str = self._state_repo.get_last_seen_timestamp(server.name, log_identifier)
+                now = datetime.utcnow()
+                recent_lines = []
+                newest_ts_in_cycle = None
+                
+                # Parse last timestamp if it exists
+                last_ts = None
+                if last_ts_str:
                     try:
-                        if source == "ssh:auto":
-                            lines, log_identifier = self._ssh.fetch_ssh_auto(_to_serverconfig(server), self._cfg.collection.tail_lines)
-                        elif source.startswith("journal:"):
-                            unit = source.split(":", 1)[1]
-                            lines = self._ssh.fetch_journal_unit_tail(_to_serverconfig(server), unit, self._cfg.collection.tail_lines)
-                            log_identifier = f"journal:{unit}"
+                        last_ts = datetime.fromisoformat(last_ts_str)
+                        self._log.debug("Last seen timestamp for %s:%s: %s", server.name, log_identifier, last_ts)
+                    except (ValueError, TypeError):
+                        self._log.warning("Invalid timestamp format for %s:%s: %s", server.name, log_identifier, last_ts_str)
+                else:
+                    self._log.info("No previous timestamp found for %s:%s, will process all %d lines", server.name, log_identifier, len(lines))
+                
+                # Process all lines to find new ones
+                for line in lines:
+                    ts = _safe_parse_ts(line, now)
+                    if ts is not None:
+                        # Track the newest timestamp we see in this cycle
+                        if newest_ts_in_cycle is None or ts > newest_ts_in_cycle:
+                            newest_ts_in_cycle = ts
+                        
+                        # Include line if it's newer than last seen or if we have no previous timestamp
+                        if last_ts is None or ts > last_ts:
+                            recent_lines.append(line)
+                            self._log.debug("Including line with timestamp %s: %s", ts, line[:100])
                         else:
-                            lines = self._ssh.fetch_tail(_to_serverconfig(server), source, self._cfg.collection.tail_lines)
-                            log_identifier = source
-                        self._log.debug("Fetched %d lines from %s:%s", len(lines), server.name, log_identifier)
-                    except Exception as e:
-                        self._log.warning("Fetch failed for %s %s: %s", server.name, source, e)
-                        continue
+                            self._log.debug("Skipping line with timestamp %s (not newer than %s)", ts, last_ts)
+                    else:
+                        self._log.debug("Could not parse timestamp from line: %s", line[:100])
+                
+                self._log.info("Found %d new lines out of %d total lines for %s:%s", len(recent_lines), len(lines), server.name, log_identifier)
 
-                    last_ts_str = self._state_repo.get_last_seen_timestamp(server.name, log_identifier)
-                    now = datetime.utcnow()
-                    recent_lines = []
-                    newest_ts_in_cycle = None
+                try:
+                    # Détection des alertes de sécurité basées sur les logs
+                    alerts = detect_alerts(server.name, log_identifier, recent_lines, now=now)
                     
-                    # Parse last timestamp if it exists
-                    last_ts = None
-                    if last_ts_str:
+                    # Ajout de la surveillance des processus (seulement pour le serveur local)
+                    if server.host in ['localhost', '127.0.0.1', '::1']:
                         try:
-                            last_ts = datetime.fromisoformat(last_ts_str)
-                            self._log.debug("Last seen timestamp for %s:%s: %s", server.name, log_identifier, last_ts)
-                        except (ValueError, TypeError):
-                            self._log.warning("Invalid timestamp format for %s:%s: %s", server.name, log_identifier, last_ts_str)
-                    else:
-                        self._log.info("No previous timestamp found for %s:%s, will process all %d lines", server.name, log_identifier, len(lines))
+                            process_alerts = run_process_monitoring(server.name)
+                            alerts.extend(process_alerts)
+                            self._log.debug("Added %d process monitoring alerts for %s", len(process_alerts), server.name)
+                        except Exception as e:
+                            self._log.warning("Process monitoring failed for %s: %s", server.name, e)
                     
-                    # Process all lines to find new ones
-                    for line in lines:
-                        ts = _safe_parse_ts(line, now)
-                        if ts is not None:
-                            # Track the newest timestamp we see in this cycle
-                            if newest_ts_in_cycle is None or ts > newest_ts_in_cycle:
-                                newest_ts_in_cycle = ts
-                            
-                            # Include line if it's newer than last seen or if we have no previous timestamp
-                            if last_ts is None or ts > last_ts:
-                                recent_lines.append(line)
-                                self._log.debug("Including line with timestamp %s: %s", ts, line[:100])
-                            else:
-                                self._log.debug("Skipping line with timestamp %s (not newer than %s)", ts, last_ts)
-                        else:
-                            self._log.debug("Could not parse timestamp from line: %s", line[:100])
+                    # Filter out alerts from ignored IPs
+                    if ignore_ips:
+                        alerts = [a for a in alerts if not (a.ip_address and a.ip_address in ignore_ips)]
                     
-                    self._log.info("Found %d new lines out of %d total lines for %s:%s", len(recent_lines), len(lines), server.name, log_identifier)
+                    # Filter out alerts based on exception rules
+                    alerts = self._exception_repo.filter_excepted(alerts)
+                    
+                    # Filter out monitoring job logs to prevent spam
+                    alerts = self._filter_monitoring_job_logs(alerts)
+                except Exception as e:
+                    self._log.error("Failed to detect alerts for %s:%s: %s", server.name, log_identifier, e)
+                    alerts = []
 
+                # Always update the timestamp to the newest we've seen, even if no alerts were generated
+                if newest_ts_in_cycle:
                     try:
-                        # Détection des alertes de sécurité basées sur les logs
-                        alerts = detect_alerts(server.name, log_identifier, recent_lines, now=now)
-                        
-                        # Ajout de la surveillance des processus (seulement pour le serveur local)
-                        if server.host in ['localhost', '127.0.0.1', '::1']:
-                            try:
-                                process_alerts = run_process_monitoring(server.name)
-                                alerts.extend(process_alerts)
-                                self._log.debug("Added %d process monitoring alerts for %s", len(process_alerts), server.name)
-                            except Exception as e:
-                                self._log.warning("Process monitoring failed for %s: %s", server.name, e)
-                        
-                        # Filter out alerts from ignored IPs
-                        if ignore_ips:
-                            alerts = [a for a in alerts if not (a.ip_address and a.ip_address in ignore_ips)]
-                        
-                        # Filter out alerts based on exception rules
-                        alerts = [a for a in alerts if not self._exception_repo.is_alert_excepted(a)]
-                        
-                        # Filter out monitoring job logs to prevent spam
-                        alerts = self._filter_monitoring_job_logs(alerts)
+                        self._state_repo.set_last_seen_timestamp(server.name, log_identifier, newest_ts_in_cycle.isoformat())
+                        self._log.debug("Updated last seen timestamp for %s:%s to %s", server.name, log_identifier, newest_ts_in_cycle)
                     except Exception as e:
-                        self._log.error("Failed to detect alerts for %s:%s: %s", server.name, log_identifier, e)
-                        alerts = []
-
-                    # Always update the timestamp to the newest we've seen, even if no alerts were generated
-                    if newest_ts_in_cycle:
-                        try:
-                            self._state_repo.set_last_seen_timestamp(server.name, log_identifier, newest_ts_in_cycle.isoformat())
-                            self._log.debug("Updated last seen timestamp for %s:%s to %s", server.name, log_identifier, newest_ts_in_cycle)
-                        except Exception as e:
-                            self._log.error("Failed to update timestamp for %s:%s: %s", server.name, log_identifier, e)
+                        self._log.error("Failed to update timestamp for %s:%s: %s", server.name, log_identifier, e)
+                
+                if alerts:
+                    try:
+                        saved = self._alerts_repo.save_alerts(alerts)
+                        # Duplicates are skipped and never get an id: notify only what was stored
+                        alerts = [a for a in alerts if a.id is not None]
+                        if saved > 0:
+                            new_alerts.extend(alerts)
+                            self._log.info("%d new alert(s) from %s:%s", saved, server.name, log_identifier)
+                    except Exception as e:
+                        self._log.error("Failed to save alerts for %s:%s: %s", server.name, log_identifier, e)
+                        continue
                     
-                    if alerts:
-                        try:
-                            saved = self._alerts_repo.save_alerts(alerts)
-                            if saved > 0:
-                                new_alerts.extend(alerts)
-                                self._log.info("%d new alert(s) from %s:%s", saved, server.name, log_identifier)
-                        except Exception as e:
-                            self._log.error("Failed to save alerts for %s:%s: %s", server.name, log_identifier, e)
-                            continue
-                        
-                        # Check for critical events that need immediate notification
-                        critical_rules = {"sshd_failed", "pam_auth_failure", "fail2ban_ban", "break_in_attempt"}
-                        critical_new = [a for a in alerts if a.rule in critical_rules]
-                        if critical_new:
-                            critical_alerts.extend(critical_new)
-                            self._log.warning("CRITICAL: %d new critical alert(s) from %s:%s", len(critical_new), server.name, log_identifier)
-                    else:
-                        self._log.debug("No alerts generated for %s:%s from %d recent lines", server.name, log_identifier, len(recent_lines))
+                    # Check for critical events that need immediate notification
+                    critical_rules = {"sshd_failed", "pam_auth_failure", "fail2ban_ban", "break_in_attempt"}
+                    critical_new = [a for a in alerts if a.rule in critical_rules]
+                    if critical_new:
+                        critical_alerts.extend(critical_new)
+                        self._log.warning("CRITICAL: %d new critical alert(s) from %s:%s", len(critical_new), server.name, log_identifier)
+                else:
+                    self._log.debug("No alerts generated for %s:%s from %d recent lines", server.name, log_identifier, len(recent_lines))
 
-            # Send immediate notifications for critical events
+            # Queue immediate notifications for critical events
             if critical_alerts and self._cfg.email.enabled:
                 try:
-                    self._notifier.send_critical_alert(critical_alerts)
-                    self._log.info("Sent immediate critical alert email for %d events", len(critical_alerts))
+                    if self._notifier.send_critical_alert(critical_alerts, defer=True):
+                        self._log.info("Queued immediate critical alert email for %d events", len(critical_alerts))
+                    else:
+                        self._log.warning("Critical alert email for %d events was not sent", len(critical_alerts))
                 except Exception as e:
-                    self._log.error("Failed to send critical alert email: %s", e)
+                    self._log.error("Failed to build critical alert email: %s", e)
 
-            # Send regular batch notifications for all new alerts
+            # Queue regular batch notifications for all new alerts
             if new_alerts and self._cfg.email.enabled:
                 try:
-                    self._notifier.send_alerts(new_alerts)
-                    self._log.info("Sent regular alert email for %d events", len(new_alerts))
+                    if self._notifier.send_alert_notification(new_alerts, defer=True):
+                        self._log.info("Queued regular alert email for %d events", len(new_alerts))
+                    else:
+                        self._log.warning("Regular alert email for %d events was not sent", len(new_alerts))
                 except Exception as e:
-                    self._log.error("Failed to send regular alert email: %s", e)
+                    self._log.error("Failed to build regular alert email: %s", e)
+
+            # Send everything queued this cycle over one SMTP session, in the background
+            try:
+                queued = self._notifier.flush()
+                if queued:
+                    self._log.info("Handed %d notification email(s) to the background sender", queued)
+            except Exception as e:
+                self._log.error("Failed to hand notification emails to the background sender: %s", e)
 
             elapsed = time.time() - cycle_start
             sleep_for = max(1.0, self._cfg.poll_interval_seconds - elapsed)
@@ -280,6 +327,15 @@ class CollectorThread(threading.Thread):
             else:
                 self._log.info("Waking up naturally for next scheduled cycle")
 
+        self._apply_pending_notifier()
+        self._notifier.close()
+        self._ssh.close()
+
+
+def _close_in_background(notifier: EmailNotifier) -> None:
+    """Drain and close a notifier without blocking the caller on a slow SMTP server."""
+    threading.Thread(target=notifier.close, name="notifier-close", daemon=True).start()
+
 
 def _to_serverconfig(s: Server):
     from config import ServerConfig
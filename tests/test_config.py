@@ -358,6 +358,34 @@ class TestLoadConfig(unittest.TestCase):
         self.assertEqual(server.host, "192.168.1.100")
         self.assertEqual(server.username, "admin")
 
+    def test_load_config_rejects_malformed_yaml(self):
+        """Test du rejet d'une configuration YAML mal structurée"""
+        malformed = [
+            "servers:\n  - host: 192.168.1.100\n",
+            "servers: not-a-list\n",
+            "email: true\n",
+        ]
+        for yaml_content in malformed:
+            with patch('builtins.open', mock_open(read_data=yaml_content)):
+                with self.assertRaises(ValueError):
+                    load_config("config.yaml")
+    
+    def test_load_config_always_reads_yaml(self):
+        """Test que la configuration est relue depuis le YAML, sans cache JSON des mots de passe"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yaml_path = os.path.join(temp_dir, "config.yaml")
+            cache_path = os.path.join(temp_dir, "config.cache.json")
+            with open(yaml_path, "w", encoding="utf-8") as f:
+                f.write("web:\n  port: 9000\nemail:\n  password: secret\n")
+            # Cache laissé par une version précédente, plus récent que le YAML
+            with open(cache_path, "w", encoding="utf-8") as f:
+                f.write('{"web": {"port": 8000}}')
+            yaml_mtime = os.stat(yaml_path).st_mtime
+            os.utime(cache_path, (yaml_mtime + 10, yaml_mtime + 10))
+            
+            config = load_config(yaml_path)
+            self.assertEqual(config.web.port, 9000)
+            self.assertEqual(os.listdir(temp_dir), ["config.yaml"])
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
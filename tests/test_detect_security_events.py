@@ -3,6 +3,7 @@
 Tests unitaires pour la détection des événements de sécurité
 """
 
+import re
 import unittest
 from datetime import datetime, timezone
 from unittest.mock import patch, MagicMock
@@ -15,7 +16,8 @@ from use_cases.detect_security_events import (
     SSHD_FAILED_RE,
     PAM_AUTH_FAIL_RE,
     BREAKIN_RE,
-    SSHD_ACCEPTED_RE
+    SSHD_ACCEPTED_RE,
+    PREFILTER_PATTERNS
 )
 
 
@@ -295,6 +297,28 @@ class TestAlertDetection(unittest.TestCase):
         # Le timestamp devrait être de l'année courante (2024)
         self.assertEqual(alert.timestamp.year, 2024)
 
+    def test_prefilter_keeps_every_alerting_line(self):
+        """Test que le pré-filtrage côté serveur ne perd aucune ligne qui produit une alerte"""
+        prefilter = re.compile("|".join(PREFILTER_PATTERNS), re.IGNORECASE)
+        lines = [
+            "2024-01-15 10:30:45 sshd[12345]: Failed password for user from 192.168.1.100",
+            "2024-01-15 10:31:00 fail2ban.actions: WARNING [sshd] Unban 192.168.1.100",
+            "2024-01-15 10:32:00 sshd[67890]: Accepted publickey for admin from 10.0.0.50",
+            "2024-01-15 10:33:00 sshd[1]: pam_unix(sshd:auth): authentication failure; rhost=10.0.0.1",
+            "2024-01-15 10:34:00 sshd[2]: POSSIBLE BREAK-IN ATTEMPT!",
+            "2024-01-15 10:35:00 kernel: IN=eth0 SRC=10.0.0.1 DST=10.0.0.2 LEN=60 PROTO=TCP SPT=1234 DPT=22",
+            "2024-01-15 10:36:00 sudo: alice : /bin/ls ; TTY=pts/0 ; USER=root",
+            "2024-01-15 10:37:00 CRON[42]: root CMD (run-parts /etc/cron.hourly)",
+            "2024-01-15 10:38:00 systemd[1]: nginx.service: Started",
+            "2024-01-15 10:39:00 audit: created /tmp/payload.sh",
+            "2024-01-15 10:40:00 user ran nc\t10.0.0.9 4444",
+            "2024-01-15 10:41:00 user ran curl http://example.invalid/x",
+        ]
+
+        for line in lines:
+            self.assertTrue(detect_alerts(self.server_name, self.log_source, [line], self.now), line)
+            self.assertIsNotNone(prefilter.search(line), line)
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour le notificateur email
+"""
+
+import threading
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from config import EmailConfig
+from domain.entities import Alert
+from infrastructure.notifiers.email_notifier import EmailNotifier
+
+
+class TestEmailNotifierHtml(unittest.TestCase):
+    """Tests pour le rendu HTML des emails"""
+
+    def setUp(self):
+        """Configuration initiale pour chaque test"""
+        self.notifier = EmailNotifier(EmailConfig(enabled=True, to_addrs=["admin@example.com"]))
+        self.alert = Alert(
+            server_name="web<1>",
+            log_source="auth.log",
+            rule="sshd_failed",
+            level="high",
+            message='Failed password for <script>alert("x")</script> & co',
+            timestamp=datetime(2024, 1, 1, 12, 0, 0),
+        )
+
+    def test_alert_fields_are_escaped(self):
+        """Test de l'échappement HTML des champs d'alerte"""
+        for build in (self.notifier._create_html_content, self.notifier._create_critical_html_content):
+            html = build([self.alert])
+            self.assertNotIn("<script>", html)
+            self.assertIn("&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt; &amp; co", html)
+            self.assertIn("SERVER: web&lt;1&gt;", html)
+            self.assertIn("SSHD_FAILED", html)
+            self.assertIn("2024-01-01 12:00:00 UTC", html)
+
+    def test_identical_alerts_render_once_with_count(self):
+        """Test du regroupement des alertes identiques en une seule ligne"""
+        repeats = [
+            Alert(server_name="web<1>", log_source="auth.log", rule="sshd_failed", level="high",
+                  message=self.alert.message, timestamp=datetime(2024, 1, 1, 12, 0, s))
+            for s in (30, 10, 20)
+        ]
+        html = self.notifier._create_html_content(repeats)
+        self.assertEqual(html.count('<div class="alert-item">'), 1)
+        self.assertIn("SSHD_FAILED &times;3", html)
+        self.assertIn("2024-01-01 12:00:10 UTC", html)
+        self.assertIn("<strong>3 new security alert(s)</strong>", html)
+
+    def test_daily_report_counts_rules(self):
+        """Test du décompte par règle dans le rapport quotidien"""
+        other = Alert(server_name="web<1>", log_source="auth.log", rule="sshd_failed", message="again")
+        html = self.notifier._create_daily_report_html([self.alert, other])
+        self.assertIn("SERVER: web&lt;1&gt;", html)
+        self.assertIn("2 alert(s)", html)
+        self.assertIn("<strong>2 total alert(s)</strong> across <strong>1 server(s)</strong>", html)
+
+    def test_oversized_batch_falls_back_to_text(self):
+        """Test de l'envoi en texte brut au-delà de max_html_bytes"""
+        notifier = EmailNotifier(EmailConfig(
+            enabled=True, from_addr="alerts@example.com",
+            to_addrs=["admin@example.com"], max_html_bytes=8192,
+        ))
+        flood = [
+            Alert(server_name="web<1>", log_source="auth.log", rule="sshd_failed", message=f"attempt {i}")
+            for i in range(50)
+        ]
+        notifier.send_alert_notification([self.alert], defer=True)
+        notifier.send_alert_notification(flood, defer=True)
+        small, large = notifier._pending
+        self.assertEqual(small.get_content_type(), "text/html")
+        self.assertEqual(large.get_content_type(), "text/plain")
+        self.assertIn("SERVER: web<1>", large.get_content())
+        self.assertIn("50 alert(s) across 1 server(s)", large.get_content())
+
+    def test_html_limit_counts_utf8_bytes(self):
+        """Test que max_html_bytes compte les octets UTF-8 et non les caractères"""
+        alerts = [
+            Alert(server_name="web1", log_source="auth.log", rule="sshd_failed", message="échec " * 40 + str(i))
+            for i in range(10)
+        ]
+        html = self.notifier._create_html_content(alerts)
+        limit = (len(html) + len(html.encode("utf-8"))) // 2
+        notifier = EmailNotifier(EmailConfig(
+            enabled=True, from_addr="alerts@example.com",
+            to_addrs=["admin@example.com"], max_html_bytes=limit,
+        ))
+        notifier.send_alert_notification(alerts, defer=True)
+        self.assertEqual(notifier._pending[0].get_content_type(), "text/plain")
+
+    def test_html_disabled_sends_text_only(self):
+        """Test de l'envoi en texte brut quand html_enabled est désactivé"""
+        notifier = EmailNotifier(EmailConfig(
+            enabled=True, from_addr="alerts@example.com",
+            to_addrs=["admin@example.com"], html_enabled=False,
+        ))
+        with patch.object(notifier, "_create_critical_html_content") as build_html:
+            notifier.send_critical_alert([self.alert], defer=True)
+        build_html.assert_not_called()
+        self.assertEqual(notifier._pending[0].get_content_type(), "text/plain")
+        self.assertIn("CRITICAL SECURITY ALERT", notifier._pending[0].get_content())
+
+    def test_deferred_send_does_not_wait_for_smtp(self):
+        """Test de la mise en file pendant qu'un envoi SMTP détient la connexion"""
+        notifier = EmailNotifier(EmailConfig(
+            enabled=True, from_addr="alerts@example.com", to_addrs=["admin@example.com"],
+        ))
+        # Simule le thread d'envoi en plein lot SMTP
+        with notifier._lock:
+            producer = threading.Thread(
+                target=notifier.send_alert_notification, args=([self.alert],), kwargs={"defer": True},
+            )
+            producer.start()
+            producer.join(timeout=5)
+            self.assertFalse(producer.is_alive())
+        self.assertEqual(len(notifier._pending), 1)
+
+    def test_repeated_smtp_failures_suspend_sending(self):
+        """Test de la mise en attente des envois après des échecs SMTP successifs"""
+        notifier = EmailNotifier(EmailConfig(
+            enabled=True, from_addr="alerts@example.com", to_addrs=["admin@example.com"],
+        ))
+        with patch.object(notifier, "_connect", side_effect=OSError("connection refused")) as connect:
+            for _ in range(5):
+                self.assertFalse(notifier.send_alert_notification([self.alert]))
+            # Pendant la suspension, les alertes critiques sont conservées au lieu d'être perdues
+            self.assertTrue(notifier.send_critical_alert([self.alert]))
+            self.assertEqual(notifier.flush(), 0)
+            self.assertEqual(connect.call_count, 5)
+        self.assertEqual(len(notifier._pending), 1)
+
+        # Fin de la suspension : le message conservé part au flush() suivant
+        notifier._backoff_until = 0.0
+        smtp = MagicMock()
+        with patch.object(notifier, "_connect", return_value=smtp):
+            self.assertEqual(notifier.flush(), 1)
+            notifier.close()
+        smtp.sendmail.assert_called_once()
+        self.assertIn(b"URGENT", smtp.sendmail.call_args[0][2])
+
+    def test_failed_batch_requeues_unsent_messages(self):
+        """Test de la remise en file des messages non envoyés après un échec en cours de lot"""
+        notifier = EmailNotifier(EmailConfig(
+            enabled=True, from_addr="alerts@example.com", to_addrs=["admin@example.com"],
+        ))
+        for _ in range(3):
+            notifier.send_alert_notification([self.alert], defer=True)
+        batch = list(notifier._pending)
+        smtp = MagicMock()
+        smtp.sendmail.side_effect = [{}, OSError("reset"), OSError("reset")]
+        with patch.object(notifier, "_connect", return_value=smtp):
+            self.assertEqual(notifier.flush(), 3)
+            notifier._sender.shutdown(wait=True)
+        self.assertEqual(notifier._pending, batch[1:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,9 +6,12 @@ Tests unitaires pour les repositories SQLite
 import unittest
 import tempfile
 import os
+import shutil
 import sqlite3
+import threading
 from datetime import datetime, timezone
 from unittest.mock import patch, MagicMock
+from infrastructure.persistence import sqlite_repositories
 from infrastructure.persistence.sqlite_repositories import (
     SQLiteAlertRepository,
     SQLiteStateRepository,
@@ -29,9 +32,8 @@ class TestSQLiteAlertRepository(unittest.TestCase):
     
     def tearDown(self):
         """Nettoyage après chaque test"""
-        if os.path.exists(self.db_path):
-            os.remove(self.db_path)
-        os.rmdir(self.temp_dir)
+        # La base est en mode WAL : supprimer aussi les fichiers -wal/-shm
+        shutil.rmtree(self.temp_dir)
     
     def test_database_creation(self):
         """Test de la création de la base de données"""
@@ -84,6 +86,88 @@ class TestSQLiteAlertRepository(unittest.TestCase):
         saved_alerts = self.repo.list_alerts()
         self.assertEqual(len(saved_alerts), 3)
     
+    def test_save_alerts_skips_duplicates(self):
+        """Test de la suppression des doublons exacts dans un lot d'alertes"""
+        ts = datetime(2024, 1, 15, 10, 30, 5)
+        line = "sshd[100]: Failed password for root from 10.0.0.1"
+        alerts = [
+            Alert(server_name="server1", rule="sshd_failed", message=line, ip_address="10.0.0.1", timestamp=ts),
+            # Même ligne relue : doublon
+            Alert(server_name="server1", rule="sshd_failed", message=line, ip_address="10.0.0.1", timestamp=ts),
+            # Tentatives distinctes dans la même minute : toutes conservées
+            Alert(server_name="server1", rule="sshd_failed", message=line, ip_address="10.0.0.1", timestamp=ts.replace(second=40)),
+            Alert(server_name="server1", rule="sshd_failed", message="sshd[101]: Failed password for root from 10.0.0.1",
+                  ip_address="10.0.0.1", timestamp=ts),
+        ]
+        
+        saved_count = self.repo.save_alerts(alerts)
+        self.assertEqual(saved_count, 3)
+        self.assertEqual(len(self.repo.list_alerts()), 3)
+        
+        # Seules les alertes réellement insérées reçoivent un identifiant
+        self.assertIsNotNone(alerts[0].id)
+        self.assertIsNone(alerts[1].id)
+        self.assertIsNotNone(alerts[2].id)
+        self.assertIsNotNone(alerts[3].id)
+        
+        # Le même événement dans un lot ultérieur est aussi ignoré
+        self.assertEqual(self.repo.save_alerts([alerts[0]]), 0)
+    
+    def test_failed_save_is_not_treated_as_duplicate(self):
+        """Test qu'un lot dont l'insertion échoue peut être sauvegardé à nouveau"""
+        alert = Alert(server_name="server1", rule="sshd_failed", message="Failed password", timestamp=datetime(2024, 1, 15, 10, 30))
+        
+        with patch.object(sqlite_repositories, "_alert_to_row", side_effect=sqlite3.OperationalError("disk I/O error")):
+            with self.assertRaises(sqlite3.OperationalError):
+                self.repo.save_alerts([alert])
+        self.assertIsNone(alert.id)
+        self.assertEqual(self.repo.list_alerts(), [])
+        
+        self.assertEqual(self.repo.save_alerts([alert]), 1)
+        self.assertEqual(len(self.repo.list_alerts()), 1)
+    
+    def test_save_large_batch_assigns_ids(self):
+        """Test des identifiants attribués lors de la sauvegarde d'un grand lot"""
+        alerts = [
+            Alert(server_name="server1", rule="rule1", message=f"Alert {i}", timestamp=datetime(2024, 1, 15, 10, 30))
+            for i in range(250)
+        ]
+        
+        self.assertEqual(self.repo.save_alerts(alerts), 250)
+        
+        stored = {alert.id: alert.message for alert in self.repo.list_alerts()}
+        self.assertEqual(len(stored), 250)
+        for alert in alerts:
+            self.assertEqual(stored[alert.id], alert.message)
+    
+    def test_short_lived_threads_do_not_leak_readers(self):
+        """Test que les lectures depuis de nombreux threads éphémères réutilisent un nombre borné de connexions"""
+        opened = []
+        connect = sqlite_repositories._connect
+        
+        def tracking_connect(*args, **kwargs):
+            conn = connect(*args, **kwargs)
+            opened.append(conn)
+            return conn
+        
+        def is_open(conn):
+            try:
+                conn.total_changes
+                return True
+            except sqlite3.ProgrammingError:
+                return False
+        
+        # Comme le serveur web de développement : un nouveau thread par requête
+        with patch.object(sqlite_repositories, "_connect", side_effect=tracking_connect):
+            for _ in range(200):
+                thread = threading.Thread(target=self.repo.list_alerts)
+                thread.start()
+                thread.join()
+        
+        self.assertLessEqual(sum(map(is_open, opened)), SQLiteAlertRepository.READER_POOL_SIZE)
+        self.repo.close()
+        self.assertFalse(any(map(is_open, opened)))
+    
     def test_list_alerts_with_limit(self):
         """Test de la liste des alertes avec limite"""
         # Création de 5 alertes
@@ -190,9 +274,8 @@ class TestSQLiteStateRepository(unittest.TestCase):
     
     def tearDown(self):
         """Nettoyage après chaque test"""
-        if os.path.exists(self.db_path):
-            os.remove(self.db_path)
-        os.rmdir(self.temp_dir)
+        # La base est en mode WAL : supprimer aussi les fichiers -wal/-shm
+        shutil.rmtree(self.temp_dir)
     
     def test_database_creation(self):
         """Test de la création de la base de données"""
@@ -252,9 +335,8 @@ class TestSQLiteServerRepository(unittest.TestCase):
     
     def tearDown(self):
         """Nettoyage après chaque test"""
-        if os.path.exists(self.db_path):
-            os.remove(self.db_path)
-        os.rmdir(self.temp_dir)
+        # La base est en mode WAL : supprimer aussi les fichiers -wal/-shm
+        shutil.rmtree(self.temp_dir)
     
     def test_database_creation(self):
         """Test de la création de la base de données"""
@@ -295,6 +377,14 @@ class TestSQLiteServerRepository(unittest.TestCase):
         self.assertEqual(saved_server.private_key_path, "/path/to/key")
         self.assertEqual(saved_server.logs, ["/var/log/auth.log", "/var/log/syslog"])
     
+    def test_log_paths_with_commas(self):
+        """Test de la conservation des chemins de logs contenant une virgule"""
+        self.repo.save_server(Server(name="test-server", host="192.168.1.100", username="admin",
+                                     logs=["/var/log/app,old.log", "journalctl:sshd"]))
+        
+        saved_server = self.repo.get_server("test-server")
+        self.assertEqual(saved_server.logs, ["/var/log/app,old.log", "journalctl:sshd"])
+    
     def test_update_server(self):
         """Test de la mise à jour d'un serveur"""
         server = Server(
@@ -370,6 +460,22 @@ class TestSQLiteServerRepository(unittest.TestCase):
         """Test de la récupération d'un serveur inexistant"""
         server = self.repo.get_server(99999)
         self.assertIsNone(server)
+    
+    def test_list_servers_sees_other_connection_writes(self):
+        """Test de l'invalidation du cache de list_servers par une autre instance"""
+        self.assertEqual(self.repo.list_servers(), [])
+        
+        # Écriture par un second repository (ex. interface web vs collecteur)
+        other = SQLiteServerRepository(self.db_path)
+        other.save_server(Server(name="test-server", host="192.168.1.100", username="admin"))
+        other.close()
+        
+        servers = self.repo.list_servers()
+        self.assertEqual([s.name for s in servers], ["test-server"])
+        
+        # Modifier les entités retournées ne doit pas altérer le cache
+        servers[0].logs.append("/var/log/auth.log")
+        self.assertEqual(self.repo.list_servers()[0].logs, [])
 
 
 class TestSQLiteAlertExceptionRepository(unittest.TestCase):
@@ -383,9 +489,8 @@ class TestSQLiteAlertExceptionRepository(unittest.TestCase):
     
     def tearDown(self):
         """Nettoyage après chaque test"""
-        if os.path.exists(self.db_path):
-            os.remove(self.db_path)
-        os.rmdir(self.temp_dir)
+        # La base est en mode WAL : supprimer aussi les fichiers -wal/-shm
+        shutil.rmtree(self.temp_dir)
     
     def test_database_creation(self):
         """Test de la création de la base de données"""
@@ -484,6 +589,22 @@ class TestSQLiteAlertExceptionRepository(unittest.TestCase):
         # Vérification que l'alerte n'est pas exceptée (exception désactivée)
         is_excepted = self.repo.is_alert_excepted(alert)
         self.assertFalse(is_excepted)
+    
+    def test_filter_excepted(self):
+        """Test du filtrage d'un lot d'alertes par les exceptions"""
+        self.repo.save_exception(AlertException(rule_type="ip", value="192.168.1.1", description="IP"))
+        self.repo.save_exception(AlertException(rule_type="rule_pattern", value="cron", description="Règle"))
+        
+        alerts = [
+            Alert(server_name="test-server", rule="sshd_failed", message="A", ip_address="192.168.1.1"),
+            Alert(server_name="test-server", rule="sshd_failed", message="B", ip_address="10.0.0.1"),
+            Alert(server_name="test-server", rule="cron_job", message="C"),
+            Alert(server_name="test-server", rule="sudo", message="D"),
+        ]
+        
+        kept = self.repo.filter_excepted(alerts)
+        self.assertEqual([a.message for a in kept], ["B", "D"])
+        self.assertEqual(kept, [a for a in alerts if not self.repo.is_alert_excepted(a)])
 
 
 if __name__ == '__main__':
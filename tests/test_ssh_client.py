@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour le client SSH (commandes générées et repli sudo)
+"""
+
+import os
+import shlex
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from config import ServerConfig
+from use_cases.detect_security_events import PREFILTER_PATTERNS
+
+try:
+    from infrastructure.ssh import ssh_client
+except ImportError:  # paramiko absent
+    ssh_client = None
+
+
+class _FakeChannel:
+    """Canal SSH simulé : sortie standard découpée comme recv() et code de sortie"""
+
+    def __init__(self, out: bytes, code: int):
+        self._out = out
+        self._code = code
+
+    def recv(self, size):
+        chunk, self._out = self._out[:size], self._out[size:]
+        return chunk
+
+    def recv_exit_status(self):
+        return self._code
+
+
+class _FakeStream:
+    def __init__(self, client=None, data=b"", channel=None):
+        self._client = client
+        self._data = data
+        self.channel = channel
+
+    def read(self):
+        return self._data
+
+    def write(self, data):
+        self._client.stdin_data.append(data)
+
+    def flush(self):
+        pass
+
+
+class _FakeClient:
+    """Client SSH simulé : enregistre les commandes, la sortie est fournie par run(cmd)"""
+
+    def __init__(self, run):
+        self._run = run
+        self.commands = []
+        self.stdin_data = []
+
+    def exec_command(self, cmd, timeout=None):
+        self.commands.append(cmd)
+        out, code = self._run(cmd)
+        return _FakeStream(self), _FakeStream(channel=_FakeChannel(out, code)), _FakeStream()
+
+    def close(self):
+        pass
+
+
+def _run_locally(env=None):
+    """Exécute réellement la commande générée avec le shell local"""
+    def run(cmd):
+        result = subprocess.run(cmd, shell=True, capture_output=True, env=env)
+        return result.stdout, result.returncode
+    return run
+
+
+@unittest.skipIf(ssh_client is None, "paramiko non installé")
+class TestSSHLogClientCommands(unittest.TestCase):
+    """Tests des commandes distantes et de l'élévation de privilèges"""
+
+    def setUp(self):
+        self.server = ServerConfig(name="srv", host="10.0.0.1", username="admin")
+        self.ssh = ssh_client.SSHLogClient()
+
+    def tearDown(self):
+        self.ssh.close()
+
+    def _connect_to(self, client):
+        return patch.object(self.ssh, "_connect", return_value=client)
+
+    def test_sudo_n_wraps_only_the_reader(self):
+        """Test que sudo -n ne s'applique qu'à tail, pas au shell ni à grep"""
+        client = _FakeClient(lambda cmd: (b"sshd[1]: Failed\n", 0) if "sudo -n " in cmd else (b"", 1))
+
+        with self._connect_to(client):
+            lines = self.ssh.fetch_tail(self.server, "/var/log/auth.log", 10, patterns=["sshd\\["])
+
+        self.assertEqual(lines, ["sshd[1]: Failed"])
+        self.assertEqual(len(client.commands), 2)
+        self.assertNotIn("sudo", client.commands[0])
+        script = shlex.split(client.commands[1])
+        self.assertEqual(script[:2], ["sh", "-c"])
+        self.assertIn("$(sudo -n tail -n 10 /var/log/auth.log)", script[2])
+        self.assertIn("| grep -E -i", script[2])
+
+    def test_sudo_password_is_sent_to_reader(self):
+        """Test du repli sudo -S avec mot de passe sur une commande simple"""
+        server = ServerConfig(name="srv", host="10.0.0.1", username="admin", password="s3cret")
+        client = _FakeClient(lambda cmd: (b"line\n", 0) if cmd.startswith("sudo -S") else (b"", 1))
+
+        with self._connect_to(client):
+            lines = self.ssh.fetch_journal_unit_tail(server, "ssh", 5)
+
+        self.assertEqual(lines, ["line"])
+        self.assertEqual(client.commands, [
+            "journalctl -u ssh -n 5 --no-pager",
+            "sudo -n journalctl -u ssh -n 5 --no-pager",
+            "sudo -S -p '' journalctl -u ssh -n 5 --no-pager",
+        ])
+        self.assertEqual(client.stdin_data, ["s3cret\n"])
+
+    def test_journal_fallback_escalates_each_unit(self):
+        """Test que le repli ssh/sshd n'élève que journalctl et fournit le mot de passe à chaque essai"""
+        server = ServerConfig(name="srv", host="10.0.0.1", username="admin", password="s3cret")
+
+        def run(cmd):
+            if cmd == ssh_client._PROBE_CMD:
+                return b"===J===\n0\n===O===\nID=debian\n", 0
+            if "sudo -S" in cmd:
+                return b"===U=sshd\nl1\nl2\n", 0
+            return b"", 1
+        client = _FakeClient(run)
+
+        with self._connect_to(client):
+            lines, identifier = self.ssh.fetch_ssh_auto(server, 20)
+
+        self.assertEqual((lines, identifier), (["l1", "l2"], "journal:sshd"))
+        script = shlex.split(client.commands[-1])
+        self.assertEqual(script[:2], ["sh", "-c"])
+        self.assertIn("$(sudo -S -p '' journalctl -u \"$u\" -n 20 --no-pager)", script[2])
+        self.assertEqual(client.stdin_data, ["s3cret\ns3cret\n"])
+
+    def test_tail_grep_runs_on_host(self):
+        """Test du filtrage grep exécuté par un vrai shell"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_path = os.path.join(temp_dir, "auth.log")
+            with open(log_path, "w", encoding="utf-8") as f:
+                f.write("Jan 1 host sshd[1]: Failed password for root from 10.0.0.9\n"
+                        "Jan 1 host boring: nothing to see\n"
+                        "Jan 1 host CRON[2]: root CMD (true)\n")
+            client = _FakeClient(_run_locally())
+
+            with self._connect_to(client):
+                lines = self.ssh.fetch_tail(self.server, log_path, 100, patterns=PREFILTER_PATTERNS)
+
+        self.assertEqual(lines, [
+            "Jan 1 host sshd[1]: Failed password for root from 10.0.0.9",
+            "Jan 1 host CRON[2]: root CMD (true)",
+        ])
+        self.assertEqual(len(client.commands), 1)
+
+    def test_tail_grep_keeps_tail_failure(self):
+        """Test qu'un fichier illisible fait échouer la commande pour déclencher le repli sudo"""
+        client = _FakeClient(_run_locally())
+        cmd = ssh_client._tail_grep_cmd("", "/nonexistent/auth.log", 10, PREFILTER_PATTERNS)
+
+        lines, _, code = self.ssh._exec(client, cmd)
+
+        self.assertEqual(lines, [])
+        self.assertNotEqual(code, 0)
+
+    def test_journal_fallback_reports_unit(self):
+        """Test du repli ssh -> sshd exécuté par un vrai shell avec un journalctl simulé"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            journalctl = os.path.join(temp_dir, "journalctl")
+            with open(journalctl, "w", encoding="utf-8") as f:
+                f.write('#!/bin/sh\n[ "$2" = sshd ] && printf "a\\nb\\n"\nexit 0\n')
+            os.chmod(journalctl, 0o755)
+            env = dict(os.environ, PATH=temp_dir + os.pathsep + os.environ.get("PATH", ""))
+            client = _FakeClient(_run_locally(env))
+
+            lines, _, code = self.ssh._exec(client, ssh_client._journal_fallback_cmd("", ("ssh", "sshd"), 5))
+
+        self.assertEqual(code, 0)
+        self.assertEqual(lines, ["===U=sshd", "a", "b"])
+
+
+if __name__ == '__main__':
+    unittest.main()
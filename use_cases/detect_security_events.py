@@ -24,6 +24,29 @@ PROCESS_CRON_JOB_ADDITION_RE = re.compile(r"cron\[\d+\]:\s+(?P<user>\S+)\s+CMD\s
 PROCESS_SERVICE_START_RE = re.compile(r"systemd\[\d+\]:\s+(?P<service>\S+)\.service:\s+(?:Started|Starting)", re.IGNORECASE)
 PROCESS_SUSPICIOUS_COMMAND_RE = re.compile(r"(?:nc\s+.*?\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|wget\s+.*?http|curl\s+.*?http|bash\s+-c\s+.*?\$|eval\s+.*?\$|base64\s+-d)", re.IGNORECASE)
 
+# Case-insensitive superset of the rules above, written so each entry is both a Python regex
+# and POSIX ERE: collectors can drop lines no rule can match before they leave the host.
+# "[ \t]" holds a real tab (not raw strings) since ERE has no escapes inside brackets.
+PREFILTER_PATTERNS = (
+    r"fail2ban",
+    r"sshd\[",
+    r"pam_unix\(sshd:auth\)",
+    r"possible break-in attempt",
+    r"kernel:",
+    r"sudo:",
+    r"audit\[",
+    r"/tmp/",
+    r"/dev/shm/",
+    r"cron\[",
+    r"systemd\[",
+    "nc[ \t]",
+    "wget[ \t]",
+    "curl[ \t]",
+    "bash[ \t]",
+    "eval[ \t]",
+    "base64[ \t]",
+)
+
 # Common log time formats
 SYSLOG_PREFIX_RE = re.compile(r"^(?P<mon>\w{3})\s+(?P<day>\d{1,2})\s+(?P<time>\d{2}:\d{2}:\d{2})\s+(?P<host>\S+)\s+(?P<rest>.*)$")
 ISO_PREFIX_RE = re.compile(r"^(?P<ts>\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:,\d{3})?)\s+(?P<rest>.*)$")
@@ -8,6 +8,16 @@ from dataclasses import dataclass
 
 from domain.entities import Alert
 
+# Compiled once at import; every ProcessMonitor shares them
+SUSPICIOUS_PATTERNS = {
+    'reverse_shell': re.compile(r'(?:nc|netcat|bash\s+-i|python\s+-c\s+.*import\s+socket)', re.IGNORECASE),
+    'download_tools': re.compile(r'(?:wget|curl|ftp|scp)\s+.*http', re.IGNORECASE),
+    'privilege_escalation': re.compile(r'(?:sudo|su|doas)\s+.*(?:bash|sh|python|perl)', re.IGNORECASE),
+    'file_manipulation': re.compile(r'(?:chmod|chown)\s+.*[0-7]{3,4}', re.IGNORECASE),
+    'network_tools': re.compile(r'(?:nmap|masscan|hydra|john)', re.IGNORECASE),
+    'crypto_mining': re.compile(r'(?:xmr|monero|bitcoin|mining)', re.IGNORECASE),
+}
+
 
 @dataclass
 class ProcessInfo:
@@ -24,14 +34,7 @@ class ProcessMonitor:
     """Moniteur de processus pour détecter les comportements suspects"""
     
     def __init__(self):
-        self.suspicious_patterns = {
-            'reverse_shell': re.compile(r'(?:nc|netcat|bash\s+-i|python\s+-c\s+.*import\s+socket)', re.IGNORECASE),
-            'download_tools': re.compile(r'(?:wget|curl|ftp|scp)\s+.*http', re.IGNORECASE),
-            'privilege_escalation': re.compile(r'(?:sudo|su|doas)\s+.*(?:bash|sh|python|perl)', re.IGNORECASE),
-            'file_manipulation': re.compile(r'(?:chmod|chown)\s+.*[0-7]{3,4}', re.IGNORECASE),
-            'network_tools': re.compile(r'(?:nmap|masscan|hydra|john)', re.IGNORECASE),
-            'crypto_mining': re.compile(r'(?:xmr|monero|bitcoin|mining)', re.IGNORECASE),
-        }
+        self.suspicious_patterns = dict(SUSPICIOUS_PATTERNS)
         
         self.whitelist_commands = {
             'sshd', 'systemd', 'cron', 'rsyslogd', 'ntpd', 'snmpd',
@@ -122,6 +125,7 @@ class ProcessMonitor:
     def analyze_process_behavior(self, process: ProcessInfo) -> List[Alert]:
         """Analyse le comportement d'un processus pour détecter des activités suspectes"""
         alerts = []
+        now = datetime.utcnow()
         
         # Vérification des patterns suspects dans la commande
         for pattern_name, pattern in self.suspicious_patterns.items():
@@ -133,7 +137,7 @@ class ProcessMonitor:
                     level="high",
                     message=f"Processus suspect détecté: {process.user} (PID {process.pid}) - {process.command}",
                     username=process.user,
-                    timestamp=datetime.utcnow()
+                    timestamp=now
                 ))
         
         # Vérification des connexions réseau suspectes
@@ -146,7 +150,7 @@ class ProcessMonitor:
                     level="medium",
                     message=f"Connexion réseau suspecte: {process.user} (PID {process.pid}) -> {remote_addr}:{remote_port}",
                     username=process.user,
-                    timestamp=datetime.utcnow()
+                    timestamp=now
                 ))
         
         # Vérification de l'utilisation excessive des ressources
@@ -158,7 +162,7 @@ class ProcessMonitor:
                 level="medium",
                 message=f"Utilisation élevée des ressources: {process.user} (PID {process.pid}) - CPU: {process.cpu_percent}%, RAM: {process.memory_percent}%",
                 username=process.user,
-                timestamp=datetime.utcnow()
+                timestamp=now
             ))
         
         return alerts
@@ -183,6 +187,7 @@ class ProcessMonitor:
     def check_file_activity(self, server_name: str) -> List[Alert]:
         """Vérifie l'activité des fichiers suspects"""
         alerts = []
+        now = datetime.utcnow()
         
         suspicious_locations = [
             '/tmp',
@@ -214,7 +219,7 @@ class ProcessMonitor:
                                     rule="suspicious_file_permissions",
                                     level="high",
                                     message=f"Fichier suspect avec permissions dangereuses: {line.strip()}",
-                                    timestamp=datetime.utcnow()
+                                    timestamp=now
                                 ))
         except Exception as e:
             print(f"Erreur lors de la vérification des fichiers: {e}")